@@ -0,0 +1,158 @@
+import threading
+import weakref
+
+import pandas as pd
+
+# Aggregations aggregate() can compute; 'mean' is derived from sum and count
+AGGREGATIONS = ['sum', 'mean', 'count', 'min', 'max', 'median', 'size']
+
+# Memoized group statistics per slice: id(slice) -> {(dimension, measure, extra): table}.
+# Entries are dropped when their slice is garbage collected, so the memo never
+# outlives the slice cache that keeps slices alive between reruns.
+_memo = {}
+_memo_lock = threading.Lock()
+
+
+def _forget_slice(slice_id):
+    with _memo_lock:
+        _memo.pop(slice_id, None)
+
+
+def _slice_memo(df):
+    slice_id = id(df)
+    with _memo_lock:
+        if slice_id not in _memo:
+            _memo[slice_id] = {}
+            weakref.finalize(df, _forget_slice, slice_id)
+        return _memo[slice_id]
+
+
+def memoize(df, key, compute):
+    """
+    Compute a value derived from a slice once and reuse it for later reruns.
+
+    Args:
+        df (pd.DataFrame): Filtered dataframe the value is derived from
+        key (tuple): Identifies the value among those memoized for df
+        compute (callable): Called with df on the first request
+
+    Returns:
+        The memoized value; callers must not modify it
+    """
+    memo = _slice_memo(df)
+    if key not in memo:
+        memo[key] = compute(df)
+    return memo[key]
+
+
+def register_slice(df, cube, ranges=None, isin=None, backend=None):
+    """
+    Record the filters a slice was taken with, so that its aggregations can be
+    rolled up from the cube, or run by the SQL backend, instead of grouping
+    its rows.
+
+    Args:
+        df (pd.DataFrame): Filtered slice of the dataset the cube was built from
+        cube (FundingCube): Materialized cube of that dataset
+        ranges (dict, optional): Range filters of the slice
+        isin (dict, optional): Value filters of the slice
+        backend (SQLBackend, optional): SQL engine over the cached dataset
+    """
+    memo = _slice_memo(df)
+    cells = cube.select(ranges, isin)
+    if cells is not None:
+        memo['cube'] = (cube, cells)
+    if backend is not None:
+        memo['sql'] = (backend, ranges, isin)
+
+
+def _group_stats(df, dimension, measure, with_median=False):
+    # One groupby per (slice, dimension, measure) computes every additive
+    # statistic; the median is only computed when a chart asks for it.
+    memo = _slice_memo(df)
+    key = (dimension, measure, with_median)
+    if key in memo:
+        return memo[key]
+
+    # Slices with a cube selection roll up cells instead of grouping rows
+    if 'cube' in memo and not with_median:
+        cube, cells = memo['cube']
+        if dimension in cube.dimensions and measure in (cube.measure, None):
+            stats = cube.rollup(dimension, cells)
+            memo[key] = stats
+            return stats
+
+    # Otherwise the SQL backend, when enabled, aggregates the cached dataset
+    # with the slice's filters pushed down
+    if 'sql' in memo:
+        backend, ranges, isin = memo['sql']
+        aggs = ('size',) if measure is None else ('size', 'sum', 'count', 'mean', 'min', 'max')
+        if with_median:
+            aggs += ('median',)
+        stats = backend.aggregate(dimension, measure, aggs, ranges=ranges, isin=isin)
+        memo[key] = stats
+        return stats
+
+    grouped = df.groupby(dimension, observed=True)
+    stats = pd.DataFrame({'size': grouped.size()})
+
+    if measure is not None:
+        values = grouped[measure]
+        stats['sum'] = values.sum()
+        stats['count'] = values.count()
+        stats['mean'] = stats['sum'] / stats['count']
+        stats['min'] = values.min()
+        stats['max'] = values.max()
+        if with_median:
+            stats['median'] = values.median()
+
+    stats = stats.reset_index()
+    memo[key] = stats
+    return stats
+
+
+def aggregate(df, dimension, measure='funding_total_usd', aggs=('sum', 'mean', 'count'),
+              min_count=None, top_k=None, sort_by=None, ascending=False):
+    """
+    Aggregate a measure by a dimension, memoized per filtered slice.
+
+    Pages describe the table they need declaratively and share one groupby per
+    slice, dimension and measure: asking for other aggregations, thresholds or
+    top-k cuts of the same grouping reuses it.
+
+    Args:
+        df (pd.DataFrame): Filtered dataframe (treated as read-only)
+        dimension (str): Column to group by
+        measure (str, optional): Numeric column to aggregate; None to only
+            count rows with 'size'
+        aggs (tuple): Aggregations from AGGREGATIONS, in output column order.
+            'count' counts non-missing measure values, 'size' counts rows
+        min_count (int, optional): Drop groups with fewer non-missing values
+            (fewer rows when measure is None)
+        top_k (int, optional): Keep the first top_k groups after sorting
+        sort_by (str, optional): Aggregation to sort by; defaults to the first
+            of `aggs` when top_k is given
+        ascending (bool): Sort order
+
+    Returns:
+        pd.DataFrame: The dimension column followed by one column per
+            aggregation, named after it. The table is a fresh copy that the
+            caller may modify.
+    """
+    unknown = [agg for agg in aggs if agg not in AGGREGATIONS]
+    if unknown:
+        raise ValueError(f"Unknown aggregations {unknown}, expected some of {AGGREGATIONS}")
+
+    stats = _group_stats(df, dimension, measure, with_median='median' in aggs)
+
+    if min_count is not None:
+        stats = stats[stats['count' if measure is not None else 'size'] >= min_count]
+
+    if sort_by is None and top_k is not None:
+        sort_by = aggs[0]
+    if sort_by is not None:
+        stats = stats.sort_values(sort_by, ascending=ascending)
+    if top_k is not None:
+        stats = stats.head(top_k)
+
+    return stats[[dimension, *aggs]].copy()
@@ -1,5 +1,5 @@
 import streamlit as st
-from data_processor import load_data
+from data_processor import load_filter_catalogue, get_filtered_slice, get_country_statistics
 from app_pages.overview import show_overview
 from app_pages.funding_analysis import show_funding_analysis
 from app_pages.geographic_analysis import show_geographic_analysis
@@ -7,15 +7,31 @@ from app_pages.temporal_analysis import show_temporal_analysis
 from app_pages.category_analysis import show_category_analysis
 from app_pages.correlation_analysis import show_correlation_analysis
 from app_pages.about import show_about_page
-from utils import set_page_config
+from filters import HOME_COUNTRY
+from utils import set_page_config, start_chart_metrics, show_chart_metrics
+from chart_metrics import DEV_PANEL
 from PIL import Image
 
+# Navigation options
+PAGES = {
+    "Overview": show_overview,
+    "Funding Analysis": show_funding_analysis,
+    "Geographic Distribution": show_geographic_analysis,
+    "Temporal Analysis": show_temporal_analysis,
+    "Category & Market Analysis": show_category_analysis,
+    "Correlation Explorer": show_correlation_analysis,
+    "About Us":show_about_page,
+}
+
+# Pages that receive the worldwide country statistics as well as the slice
+WORLDWIDE_PAGES = ['Geographic Distribution']
+
 def main():
     # Set page configuration
     set_page_config()
     
-    # Load data All countries Data
-    df = load_data()
+    # Load the filter metadata of the All countries Data
+    catalogue = load_filter_catalogue()
     
 
     
@@ -39,57 +55,42 @@ def main():
         
     """, unsafe_allow_html=True)
     st.sidebar.title("Startup Analysis Dashboard")
-    # Navigation options
-    pages = {
-        "Overview": show_overview,
-        "Funding Analysis": show_funding_analysis,
-        "Geographic Distribution": show_geographic_analysis,
-        "Temporal Analysis": show_temporal_analysis,
-        "Category & Market Analysis": show_category_analysis,
-        "Correlation Explorer": show_correlation_analysis,
-        "About Us":show_about_page,
-    }
-    
     # Page selection
-    selection = st.sidebar.radio("Navigate", list(pages.keys()))
+    selection = st.sidebar.radio("Navigate", list(PAGES.keys()))
     
     
     # Display filters in sidebar for all pages
     st.sidebar.markdown("---")
     st.sidebar.subheader("Global Filters")
     
+    # Filters are collected here and applied at once through the filter index,
+    # reusing the cached slice when the same filters were applied before
+    ranges = {}
+    isin = {}
+    
     # Year range filter    
-    if 'founded_year' in df.columns and df['founded_year'].notna().any():
-        min_year = int(df['founded_year'].min())
-        max_year = int(df['founded_year'].max())
+    if catalogue['year_range'] is not None:
+        min_year, max_year = catalogue['year_range']
         year_range = st.sidebar.slider(
             "Founded Year Range",
             min_year, max_year, (min_year, max_year)
         )
-        df_filtered = df[(df['founded_year'] >= year_range[0]) & (df['founded_year'] <= year_range[1])]
-    else:
-        df_filtered = df
+        ranges['founded_year'] = year_range
             
     # Funding range filter (log scale for better distribution)
-    if 'funding_total_usd' in df.columns and df['funding_total_usd'].notna().any():
-        df_india = df.copy()
-        df_india = df_india[df_india['country_code'].str.upper() == 'IND']    
-        min_funding = float(df_india['funding_total_usd'].min())
-        max_funding = float(df_india['funding_total_usd'].max())
+    if catalogue['funding_range'] is not None:
+        min_funding, max_funding = catalogue['funding_range']
         funding_range = st.sidebar.slider(
             "Total Funding Range ($ millions)",
             min_funding, max_funding, (min_funding, max_funding),
             format="$%.2f"            
         )
         
-        df_filtered = df_filtered[
-            (df_filtered['funding_total_usd'] >= funding_range[0]) & 
-            (df_filtered['funding_total_usd'] <= funding_range[1])
-        ]
+        ranges['funding_total_usd'] = funding_range
     
     # Market/category filter (multi-select)
-    if 'market' in df.columns and df['market'].notna().any():
-        top_markets = df['market'].value_counts().nlargest(20).index.tolist()
+    if catalogue['top_markets'] is not None:
+        top_markets = catalogue['top_markets']
         selected_markets = st.sidebar.multiselect(
             "Markets",
             options=["All"] + top_markets,
@@ -97,11 +98,11 @@ def main():
         )
         
         if "All" not in selected_markets and selected_markets:
-            df_filtered = df_filtered[df_filtered['market'].isin(selected_markets)]
+            isin['market'] = selected_markets
     
     # Status filter
-    if 'status' in df.columns and df['status'].notna().any():
-        statuses = df['status'].unique().tolist()
+    if catalogue['statuses'] is not None:
+        statuses = catalogue['statuses']
         selected_status = st.sidebar.multiselect(
             "Company Status",
             options=["All"] + statuses,
@@ -109,12 +110,11 @@ def main():
         )
         
         if "All" not in selected_status and selected_status:
-            df_filtered = df_filtered[df_filtered['status'].isin(selected_status)]
+            isin['status'] = selected_status
     
     # Region/country filter
-    if 'region' in df.columns and df['region'].notna().any():
-        df_india = df[df['country_code'] == 'IND']
-        top_regions = df_india['region'].drop(index=df_india[df_india['region'] == 'Unknown'].index).value_counts().nlargest(10).index.tolist()
+    if catalogue['top_regions'] is not None:
+        top_regions = catalogue['top_regions']
         selected_regions = st.sidebar.multiselect(
             "Regions",
             options=["All"] + top_regions,
@@ -122,13 +122,21 @@ def main():
         )
         
         if "All" not in selected_regions and selected_regions:
-            df_filtered = df_filtered[df_filtered['region'].isin(selected_regions)]
+            isin['region'] = selected_regions
     
-    # Display selected page with filtered data
-    if(selection != 'Geographic Distribution'):
-        df_filtered = df_filtered[df_filtered['country_code'].str.upper() == 'IND']    
+    # Display selected page with filtered data. Pages see the rows of the home
+    # country; the Geographic page also gets worldwide statistics, which are
+    # aggregated country by country instead of from every country's rows
+    df_filtered = get_filtered_slice(ranges, {**isin, 'country_code': [HOME_COUNTRY]})
+    start_chart_metrics(selection)
+    if selection in WORLDWIDE_PAGES:
+        PAGES[selection](df_filtered, get_country_statistics(ranges, isin))
+    else:
+        PAGES[selection](df_filtered)
     
-    pages[selection](df_filtered)
+    # Payload size and timings of the charts just rendered, for developers
+    if DEV_PANEL:
+        show_chart_metrics()
     
     # Footer
     st.sidebar.markdown("---")    
@@ -1,14 +1,69 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
 import plotly.express as px
+from aggregations import aggregate
+from category_table import COOCCURRENCE_MEASURES
+from data_processor import drop_unused_categories, load_category_table
 from utils import (
+    fragment,
+    lazy_tabs,
     create_pie_chart,
     create_bar_chart,
     #create_wordcloud,
-    create_heatmap
+    create_heatmap,
+    render_chart
 )
 
+@fragment
+def show_category_cooccurrence(df):
+    """
+    Display the co-occurrence heatmap of the top categories with its controls.
+    
+    Args:
+        df (pd.DataFrame): Filtered dataframe
+    """
+    categories = load_category_table()
+    
+    # Let user choose how many categories and which normalization to show
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        top_n = st.slider(
+            "Number of top categories",
+            min_value=5,
+            max_value=300,
+            value=15,
+            step=5
+        )
+    
+    with col2:
+        measure = st.selectbox(
+            "Measure",
+            options=COOCCURRENCE_MEASURES,
+            format_func=lambda m: {'count': 'Co-occurrences', 'lift': 'Lift', 'jaccard': 'Jaccard similarity'}[m]
+        )
+    
+    # Calculate co-occurrences from one sparse matrix product
+    co_occurrence = categories.cooccurrence(df.index, top_n=top_n, measure=measure)
+    
+    # Create heatmap
+    fig = px.imshow(
+        co_occurrence,
+        labels=dict(x='Category', y='Category', color=measure.capitalize()),
+        x=co_occurrence.columns,
+        y=co_occurrence.index,
+        color_continuous_scale='Blues',
+        title='Category Co-occurrence Matrix'
+    )
+    
+    fig.update_layout(
+        height=700,
+        width=700
+    )
+    
+    render_chart(fig, use_container_width=True)
+
+
 def show_category_analysis(df):
     """
     Display the category and market analysis page with industry-based insights.
@@ -20,7 +75,7 @@ def show_category_analysis(df):
     st.write("Explore startup distribution across different categories and markets, including funding and success metrics.")
     
     # Check if category/market columns exist
-    cat_cols = ['category_list', 'market', 'categories', 'main_category']
+    cat_cols = ['category_list', 'market', 'main_category']
     existing_cat_cols = [col for col in cat_cols if col in df.columns]
     
     if not existing_cat_cols:
@@ -43,7 +98,7 @@ def show_category_analysis(df):
             'Count',
             'Distribution of Top 10 Markets'
         )
-        st.plotly_chart(market_fig, use_container_width=True)
+        render_chart(market_fig, use_container_width=True)
         
         # Create bar chart for more markets
         top_markets_bar = market_counts.head(20)
@@ -54,7 +109,7 @@ def show_category_analysis(df):
             'Top 20 Markets by Number of Companies',
             horizontal=True
         )
-        st.plotly_chart(market_bar_fig, use_container_width=True)
+        render_chart(market_bar_fig, use_container_width=True)
         
         '''
         # Market word cloud
@@ -88,16 +143,10 @@ def show_category_analysis(df):
             'Top 15 Categories by Number of Companies',
             horizontal=True
         )
-        st.plotly_chart(category_fig, use_container_width=True)
+        render_chart(category_fig, use_container_width=True)
     elif 'category_list' in df.columns:
-        # Process category list
-        categories = []
-        for cat_list in df['category_list'].dropna():
-            for category in cat_list.split('|'):
-                categories.append(category.strip())
-        
-        # Count categories
-        category_counts = pd.Series(categories).value_counts().reset_index()
+        # Count categories from the normalized category table
+        category_counts = load_category_table().frequencies(df.index).reset_index()
         category_counts.columns = ['Category', 'Count']
         top_categories = category_counts.head(15)
         
@@ -109,7 +158,7 @@ def show_category_analysis(df):
             'Top 15 Categories by Number of Companies',
             horizontal=True
         )
-        st.plotly_chart(category_fig, use_container_width=True)
+        render_chart(category_fig, use_container_width=True)
     else:
         st.info("Category information not available in the dataset.")
     
@@ -117,119 +166,107 @@ def show_category_analysis(df):
     st.subheader("Funding by Market/Category")
     
     # Tabs for market and category
-    tab1, tab2 = st.tabs(["Market", "Category"])
+    tab1, tab2 = lazy_tabs(["Market", "Category"], key='category_market_tabs')
     
     with tab1:
-        if 'market' in df.columns and 'funding_total_usd' in df.columns:
-            # Group by market and calculate total/average funding
-            market_funding = df.groupby('market').agg({
-                'funding_total_usd': ['sum', 'mean', 'count']
-            }).reset_index()
-            
-            market_funding.columns = ['market', 'total_funding', 'avg_funding', 'company_count']
-            market_funding = market_funding.sort_values('total_funding', ascending=False).head(15)
+        if tab1.open:
+            if 'market' in df.columns and 'funding_total_usd' in df.columns:
+                # Group by market and calculate total/average funding
+                market_funding = aggregate(df, 'market', aggs=('sum', 'mean', 'count'), top_k=15)
+                market_funding.columns = ['market', 'total_funding', 'avg_funding', 'company_count']
             
-            # Create sub-tabs for different metrics
-            subtab1, subtab2, subtab3 = st.tabs(["Total Funding", "Average Funding", "Company Count"])
+                # Create sub-tabs for different metrics
+                subtab1, subtab2, subtab3 = lazy_tabs(["Total Funding", "Average Funding", "Company Count"], key='category_market_metric_tabs')
             
-            with subtab1:
-                total_fig = create_bar_chart(
-                    market_funding,
-                    'market',
-                    'total_funding',
-                    'Top 15 Markets by Total Funding',
-                    horizontal=True
-                )
-                st.plotly_chart(total_fig, use_container_width=True)
+                with subtab1:
+                    if subtab1.open:
+                        total_fig = create_bar_chart(
+                            market_funding,
+                            'market',
+                            'total_funding',
+                            'Top 15 Markets by Total Funding',
+                            horizontal=True
+                        )
+                        render_chart(total_fig, use_container_width=True)
             
-            with subtab2:
-                avg_funding_markets = df.groupby('market').agg({
-                    'funding_total_usd': ['mean', 'count']
-                }).reset_index()
+                with subtab2:
+                    if subtab2.open:
+                        # Markets with at least 5 companies, reusing the grouping above
+                        avg_funding_markets = aggregate(df, 'market', aggs=('mean', 'count'), min_count=5, top_k=15)
+                        avg_funding_markets.columns = ['market', 'avg_funding', 'company_count']
                 
-                avg_funding_markets.columns = ['market', 'avg_funding', 'company_count']
-                
-                # Filter to markets with at least 5 companies
-                avg_funding_markets = avg_funding_markets[avg_funding_markets['company_count'] >= 5]
-                avg_funding_markets = avg_funding_markets.sort_values('avg_funding', ascending=False).head(15)
-                
-                avg_fig = create_bar_chart(
-                    avg_funding_markets,
-                    'market',
-                    'avg_funding',
-                    'Top 15 Markets by Average Funding (Min 5 Companies)',
-                    horizontal=True
-                )
-                st.plotly_chart(avg_fig, use_container_width=True)
+                        avg_fig = create_bar_chart(
+                            avg_funding_markets,
+                            'market',
+                            'avg_funding',
+                            'Top 15 Markets by Average Funding (Min 5 Companies)',
+                            horizontal=True
+                        )
+                        render_chart(avg_fig, use_container_width=True)
             
-            with subtab3:
-                count_fig = create_bar_chart(
-                    market_funding.sort_values('company_count', ascending=False).head(15),
-                    'market',
-                    'company_count',
-                    'Top 15 Markets by Company Count',
-                    horizontal=True
-                )
-                st.plotly_chart(count_fig, use_container_width=True)
-        else:
-            st.info("Market or funding information not available in the dataset.")
+                with subtab3:
+                    if subtab3.open:
+                        count_fig = create_bar_chart(
+                            market_funding.sort_values('company_count', ascending=False).head(15),
+                            'market',
+                            'company_count',
+                            'Top 15 Markets by Company Count',
+                            horizontal=True
+                        )
+                        render_chart(count_fig, use_container_width=True)
+            else:
+                st.info("Market or funding information not available in the dataset.")
     
     with tab2:
-        if 'main_category' in df.columns and 'funding_total_usd' in df.columns:
-            # Group by category and calculate total/average funding
-            category_funding = df.groupby('main_category').agg({
-                'funding_total_usd': ['sum', 'mean', 'count']
-            }).reset_index()
-            
-            category_funding.columns = ['category', 'total_funding', 'avg_funding', 'company_count']
-            category_funding = category_funding.sort_values('total_funding', ascending=False).head(15)
+        if tab2.open:
+            if 'main_category' in df.columns and 'funding_total_usd' in df.columns:
+                # Group by category and calculate total/average funding
+                category_funding = aggregate(df, 'main_category', aggs=('sum', 'mean', 'count'), top_k=15)
+                category_funding.columns = ['category', 'total_funding', 'avg_funding', 'company_count']
             
-            # Create sub-tabs for different metrics
-            subtab1, subtab2, subtab3 = st.tabs(["Total Funding", "Average Funding", "Company Count"])
+                # Create sub-tabs for different metrics
+                subtab1, subtab2, subtab3 = lazy_tabs(["Total Funding", "Average Funding", "Company Count"], key='category_category_metric_tabs')
             
-            with subtab1:
-                total_fig = create_bar_chart(
-                    category_funding,
-                    'category',
-                    'total_funding',
-                    'Top 15 Categories by Total Funding',
-                    horizontal=True
-                )
-                st.plotly_chart(total_fig, use_container_width=True)
+                with subtab1:
+                    if subtab1.open:
+                        total_fig = create_bar_chart(
+                            category_funding,
+                            'category',
+                            'total_funding',
+                            'Top 15 Categories by Total Funding',
+                            horizontal=True
+                        )
+                        render_chart(total_fig, use_container_width=True)
             
-            with subtab2:
-                avg_funding_categories = df.groupby('main_category').agg({
-                    'funding_total_usd': ['mean', 'count']
-                }).reset_index()
-                
-                avg_funding_categories.columns = ['category', 'avg_funding', 'company_count']
-                
-                # Filter to categories with at least 5 companies
-                avg_funding_categories = avg_funding_categories[avg_funding_categories['company_count'] >= 5]
-                avg_funding_categories = avg_funding_categories.sort_values('avg_funding', ascending=False).head(15)
+                with subtab2:
+                    if subtab2.open:
+                        # Categories with at least 5 companies, reusing the grouping above
+                        avg_funding_categories = aggregate(df, 'main_category', aggs=('mean', 'count'), min_count=5, top_k=15)
+                        avg_funding_categories.columns = ['category', 'avg_funding', 'company_count']
                 
-                avg_fig = create_bar_chart(
-                    avg_funding_categories,
-                    'category',
-                    'avg_funding',
-                    'Top 15 Categories by Average Funding (Min 5 Companies)',
-                    horizontal=True
-                )
-                st.plotly_chart(avg_fig, use_container_width=True)
+                        avg_fig = create_bar_chart(
+                            avg_funding_categories,
+                            'category',
+                            'avg_funding',
+                            'Top 15 Categories by Average Funding (Min 5 Companies)',
+                            horizontal=True
+                        )
+                        render_chart(avg_fig, use_container_width=True)
             
-            with subtab3:
-                count_fig = create_bar_chart(
-                    category_funding.sort_values('company_count', ascending=False).head(15),
-                    'category',
-                    'company_count',
-                    'Top 15 Categories by Company Count',
-                    horizontal=True
-                )
-                st.plotly_chart(count_fig, use_container_width=True)
-        elif 'category_list' in df.columns and 'funding_total_usd' in df.columns:
-            st.info("Category analysis requires preprocessing of category_list column. See overview for more information.")
-        else:
-            st.info("Category or funding information not available in the dataset.")
+                with subtab3:
+                    if subtab3.open:
+                        count_fig = create_bar_chart(
+                            category_funding.sort_values('company_count', ascending=False).head(15),
+                            'category',
+                            'company_count',
+                            'Top 15 Categories by Company Count',
+                            horizontal=True
+                        )
+                        render_chart(count_fig, use_container_width=True)
+            elif 'category_list' in df.columns and 'funding_total_usd' in df.columns:
+                st.info("Category analysis requires preprocessing of category_list column. See overview for more information.")
+            else:
+                st.info("Category or funding information not available in the dataset.")
     
     # Category and status relationship
     st.subheader("Market Success Analysis")
@@ -238,20 +275,14 @@ def show_category_analysis(df):
         # Define successful statuses
         success_statuses = ['ipo', 'acquired']
         
-        # Create success column
-        df['success'] = df['status'].isin(success_statuses)
+        # Create success column (on a copy-on-write overlay, not the shared frame)
+        df = df.assign(success=df['status'].isin(success_statuses))
         
         # Calculate success rate by market
-        market_success = df.groupby('market').agg({
-            'success': ['mean', 'count']
-        }).reset_index()
-        
+        # Markets with at least 10 companies
+        market_success = aggregate(df, 'market', 'success', aggs=('mean', 'count'), min_count=10, top_k=15)
         market_success.columns = ['market', 'success_rate', 'company_count']
         
-        # Filter to markets with at least 10 companies
-        market_success = market_success[market_success['company_count'] >= 10]
-        market_success = market_success.sort_values('success_rate', ascending=False).head(15)
-        
         # Format success rate as percentage
         market_success['success_rate'] = market_success['success_rate'] * 100
         
@@ -268,13 +299,13 @@ def show_category_analysis(df):
             xaxis_title='Success Rate (%)'
         )
         
-        st.plotly_chart(success_fig, use_container_width=True)
+        render_chart(success_fig, use_container_width=True)
         
         # Status distribution by top markets
         top_markets = df['market'].value_counts().nlargest(5).index.tolist()
         
         # Filter to top markets
-        top_markets_df = df[df['market'].isin(top_markets)]
+        top_markets_df = drop_unused_categories(df[df['market'].isin(top_markets)])
         
         # Create stacked bar chart
         fig = px.histogram(
@@ -289,7 +320,7 @@ def show_category_analysis(df):
                 'status': 'Status'
             }
         )
-        st.plotly_chart(fig, use_container_width=True)
+        render_chart(fig, use_container_width=True)
     else:
         st.info("Market or status information not available in the dataset.")
     
@@ -301,10 +332,10 @@ def show_category_analysis(df):
         top_markets = df['market'].value_counts().nlargest(5).index.tolist()
         
         # Filter to top markets
-        top_markets_df = df[df['market'].isin(top_markets)]
+        top_markets_df = drop_unused_categories(df[df['market'].isin(top_markets)])
         
         # Group by year and market
-        market_years = top_markets_df.groupby(['founded_year', 'market']).size().reset_index(name='count')
+        market_years = top_markets_df.groupby(['founded_year', 'market'], observed=True).size().reset_index(name='count')
         
         # Create line chart
         fig = px.line(
@@ -325,7 +356,7 @@ def show_category_analysis(df):
             yaxis_title='Number of Companies'
         )
         
-        st.plotly_chart(fig, use_container_width=True)
+        render_chart(fig, use_container_width=True)
         
         # Market heatmap by year
         if len(top_markets) > 0:
@@ -344,57 +375,15 @@ def show_category_analysis(df):
                 'count',
                 'Market Activity Heatmap by Year'
             )
-            st.plotly_chart(heatmap_fig, use_container_width=True)
+            render_chart(heatmap_fig, use_container_width=True)
     else:
         st.info("Market or founding year information not available in the dataset.")
     
     # Category co-occurrence
     st.subheader("Category Co-occurrence")
     
-    if 'categories' in df.columns:
-        # Extract unique categories
-        all_categories = []
-        for cats in df['categories'].dropna():
-            if isinstance(cats, list):
-                all_categories.extend(cats)
-        
-        # Get top categories
-        top_categories = pd.Series(all_categories).value_counts().nlargest(15).index.tolist()
-        
-        # Create co-occurrence matrix
-        co_occurrence = pd.DataFrame(0, index=top_categories, columns=top_categories)
-        
-        # Calculate co-occurrences
-        for cats in df['categories'].dropna():
-            if isinstance(cats, list):
-                # Filter to top categories
-                filtered_cats = [cat for cat in cats if cat in top_categories]
-                
-                # Calculate co-occurrences
-                for i, cat1 in enumerate(filtered_cats):
-                    for cat2 in filtered_cats[i:]:
-                        co_occurrence.loc[cat1, cat2] += 1
-                        if cat1 != cat2:
-                            co_occurrence.loc[cat2, cat1] += 1
-        
-        # Create heatmap
-        fig = px.imshow(
-            co_occurrence,
-            labels=dict(x='Category', y='Category', color='Co-occurrences'),
-            x=co_occurrence.columns,
-            y=co_occurrence.index,
-            color_continuous_scale='Blues',
-            title='Category Co-occurrence Matrix'
-        )
-        
-        fig.update_layout(
-            height=700,
-            width=700
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-    elif 'category_list' in df.columns:
-        st.info("Category co-occurrence analysis requires preprocessing of category_list column. See overview for more information.")
+    if 'category_list' in df.columns:
+        show_category_cooccurrence(df)
     else:
         st.info("Category information not available in the dataset.")
      
\ No newline at end of file
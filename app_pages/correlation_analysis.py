@@ -2,41 +2,32 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
+from data_processor import drop_unused_categories
 from utils import (
+    fragment,
     create_correlation_matrix,
     create_scatter_plot,
     create_histogram,
-    create_heatmap
+    create_heatmap,
+    render_chart
 )
 from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
 
-def show_correlation_analysis(df):
+
+@fragment
+def show_correlation_matrix(df, numeric_cols, default_corr_cols):
     """
-    Display the correlation analysis page with relationships between variables.
+    Display the correlation matrix of user-selected columns.
     
     Args:
         df (pd.DataFrame): Filtered dataframe
+        numeric_cols (list): Numeric columns of df
+        default_corr_cols (list): Columns selected by default
     """
-    st.title("Correlation Explorer")
-    st.write("Explore relationships between different variables in the dataset.")
-    
-    # Check if numeric columns exist
-    numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-    
-    if not numeric_cols:
-        st.warning("No numeric columns available for correlation analysis.")
-        return
-    
     # Correlation matrix
     st.subheader("Correlation Matrix")
     
-    # Let user select columns for correlation
-    default_corr_cols = [col for col in [
-        'funding_total_usd', 'funding_rounds', 'founded_year',
-        'category_count', 'company_age_years', 'funding_age_years'
-    ] if col in numeric_cols]
-    
     selected_corr_cols = st.multiselect(
         "Select columns for correlation analysis",
         options=numeric_cols,
@@ -50,10 +41,21 @@ def show_correlation_analysis(df):
             selected_corr_cols,
             'Correlation Matrix of Selected Variables'
         )
-        st.plotly_chart(corr_fig, use_container_width=True)
+        render_chart(corr_fig, use_container_width=True)
     else:
         st.info("Please select at least one column for correlation analysis.")
+
+
+@fragment
+def show_scatter_explorer(df, numeric_cols, full_resolution=False):
+    """
+    Display the scatter plot explorer with its axis, color and size pickers.
     
+    Args:
+        df (pd.DataFrame): Filtered dataframe
+        numeric_cols (list): Numeric columns of df
+        full_resolution (bool): Plot every point instead of a sample
+    """
     # Scatter plot explorer
     st.subheader("Scatter Plot Explorer")
     
@@ -99,22 +101,32 @@ def show_correlation_analysis(df):
     # Create scatter plot
     if x_col != y_col:
         # Create figure
-        fig = px.scatter(
+        fig = create_scatter_plot(
             df,
-            x=x_col,
-            y=y_col,
-            color=color_col,
-            size=size_col,
-            title=f'Relationship between {x_col} and {y_col}',
-            opacity=0.7,
+            x_col,
+            y_col,
+            f'Relationship between {x_col} and {y_col}',
+            color_col=color_col,
+            size_col=size_col,
             log_x=use_log_x,
-            log_y=use_log_y
+            log_y=use_log_y,
+            full_resolution=full_resolution
         )
         
-        st.plotly_chart(fig, use_container_width=True)
+        render_chart(fig, use_container_width=True)
     else:
         st.warning("Please select different columns for X and Y axes.")
+
+
+@fragment
+def show_distribution_comparison(df, numeric_cols):
+    """
+    Display the distribution of a user-selected column by company status.
     
+    Args:
+        df (pd.DataFrame): Filtered dataframe
+        numeric_cols (list): Numeric columns of df
+    """
     # Distribution comparison
     st.subheader("Distribution Comparison")
     
@@ -129,41 +141,32 @@ def show_correlation_analysis(df):
         # Use log scale option
         use_log_dist = st.checkbox("Use logarithmic scale for distribution", value=True)
         
-        # Create figure
-        fig = px.histogram(
+        # Create figure from bins and quartiles computed per status
+        fig = create_histogram(
             df,
-            x=dist_col,
-            color='status',
-            marginal='box',
-            title=f'Distribution of {dist_col} by Company Status',
+            dist_col,
+            f'Distribution of {dist_col} by Company Status',
+            color_col='status',
             log_x=use_log_dist,
+            marginal_box=True,
             barmode='overlay',
             opacity=0.7
         )
         
-        st.plotly_chart(fig, use_container_width=True)
-    
-    # Funding vs. age analysis
-    st.subheader("Funding vs. Age Analysis")
-    
-    if all(col in df.columns for col in ['company_age_years', 'funding_total_usd']):
-        # Create scatter plot
-        fig = create_scatter_plot(
-            df,
-            'company_age_years',
-            'funding_total_usd',
-            'Relationship between Company Age and Total Funding',
-            color_col='market' if 'market' in df.columns else None,
-            size_col='funding_rounds' if 'funding_rounds' in df.columns else None
-        )
-        
-        # Add logarithmic y-axis
-        fig.update_layout(
-            yaxis_type='log'
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        render_chart(fig, use_container_width=True)
+
+
+@fragment
+def show_pca(df, numeric_cols, default_corr_cols, full_resolution=False):
+    """
+    Display the principal component analysis of user-selected columns.
     
+    Args:
+        df (pd.DataFrame): Filtered dataframe
+        numeric_cols (list): Numeric columns of df
+        default_corr_cols (list): Columns selected by default
+        full_resolution (bool): Plot every point instead of a sample
+    """
     # Principal Component Analysis (PCA)
     st.subheader("Principal Component Analysis")
     
@@ -177,7 +180,7 @@ def show_correlation_analysis(df):
         
         if len(pca_cols) >= 3:
             # Create dataframe for PCA
-            pca_df = df[pca_cols].copy()
+            pca_df = df[pca_cols]
             
             # Replace infs and drop rows with NaN
             pca_df = pca_df.replace([np.inf, -np.inf], np.nan).dropna()
@@ -208,38 +211,25 @@ def show_correlation_analysis(df):
                 if 'market' in pca_result_df.columns:
                     # Get top markets
                     top_markets = df['market'].value_counts().nlargest(10).index.tolist()
-                    pca_result_df = pca_result_df[pca_result_df['market'].isin(top_markets)]
-                    
-                    fig = px.scatter(
-                        pca_result_df,
-                        x='PC1',
-                        y='PC2',
-                        color='market',
-                        title='PCA Visualization of Startup Data',
-                        labels={'PC1': f'PC1 ({pca.explained_variance_ratio_[0]:.2%} variance)',
-                                'PC2': f'PC2 ({pca.explained_variance_ratio_[1]:.2%} variance)'}
-                    )
+                    pca_result_df = drop_unused_categories(pca_result_df[pca_result_df['market'].isin(top_markets)])
+                    color_col = 'market'
                 elif 'status' in pca_result_df.columns:
-                    fig = px.scatter(
-                        pca_result_df,
-                        x='PC1',
-                        y='PC2',
-                        color='status',
-                        title='PCA Visualization of Startup Data',
-                        labels={'PC1': f'PC1 ({pca.explained_variance_ratio_[0]:.2%} variance)',
-                                'PC2': f'PC2 ({pca.explained_variance_ratio_[1]:.2%} variance)'}
-                    )
+                    color_col = 'status'
                 else:
-                    fig = px.scatter(
-                        pca_result_df,
-                        x='PC1',
-                        y='PC2',
-                        title='PCA Visualization of Startup Data',
-                        labels={'PC1': f'PC1 ({pca.explained_variance_ratio_[0]:.2%} variance)',
-                                'PC2': f'PC2 ({pca.explained_variance_ratio_[1]:.2%} variance)'}
-                    )
+                    color_col = None
                 
-                st.plotly_chart(fig, use_container_width=True)
+                fig = create_scatter_plot(
+                    pca_result_df,
+                    'PC1',
+                    'PC2',
+                    'PCA Visualization of Startup Data',
+                    color_col=color_col,
+                    labels={'PC1': f'PC1 ({pca.explained_variance_ratio_[0]:.2%} variance)',
+                            'PC2': f'PC2 ({pca.explained_variance_ratio_[1]:.2%} variance)'},
+                    full_resolution=full_resolution
+                )
+                
+                render_chart(fig, use_container_width=True)
                 
                 # Feature importance
                 st.subheader("Feature Importance in PCA")
@@ -258,7 +248,7 @@ def show_correlation_analysis(df):
                     title='Feature Loadings for Principal Component 1',
                     labels={'x': 'Feature', 'y': 'Loading'}
                 )
-                st.plotly_chart(pc1_fig, use_container_width=True)
+                render_chart(pc1_fig, use_container_width=True)
                 
                 # Create bar chart for PC2
                 pc2_fig = px.bar(
@@ -267,10 +257,69 @@ def show_correlation_analysis(df):
                     title='Feature Loadings for Principal Component 2',
                     labels={'x': 'Feature', 'y': 'Loading'}
                 )
-                st.plotly_chart(pc2_fig, use_container_width=True)
+                render_chart(pc2_fig, use_container_width=True)
             else:
                 st.warning("Not enough complete data points for PCA after removing missing values.")
         else:
             st.info("Please select at least 3 columns for PCA.")
     else:
-        st.info("Not enough numeric columns available for PCA.")
\ No newline at end of file
+        st.info("Not enough numeric columns available for PCA.")
+
+
+def show_correlation_analysis(df):
+    """
+    Display the correlation analysis page with relationships between variables.
+    
+    Args:
+        df (pd.DataFrame): Filtered dataframe
+    """
+    st.title("Correlation Explorer")
+    st.write("Explore relationships between different variables in the dataset.")
+    
+    # Check if numeric columns exist
+    numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
+    
+    if not numeric_cols:
+        st.warning("No numeric columns available for correlation analysis.")
+        return
+    
+    # Let user select columns for correlation
+    default_corr_cols = [col for col in [
+        'funding_total_usd', 'funding_rounds', 'founded_year',
+        'category_count', 'company_age_years', 'funding_age_years'
+    ] if col in numeric_cols]
+    
+    # Large scatter plots show a sample of their points unless asked otherwise
+    full_resolution = st.checkbox(
+        "Plot every point in scatter plots (slower for large selections)",
+        value=False
+    )
+    
+    # Sections with their own widgets are fragments: changing one of their
+    # widgets only reruns that section, not the whole app
+    show_correlation_matrix(df, numeric_cols, default_corr_cols)
+    
+    show_scatter_explorer(df, numeric_cols, full_resolution)
+    
+    show_distribution_comparison(df, numeric_cols)
+    
+    # Funding vs. age analysis
+    st.subheader("Funding vs. Age Analysis")
+    
+    if all(col in df.columns for col in ['company_age_years', 'funding_total_usd']):
+        # Create scatter plot
+        fig = create_scatter_plot(
+            df,
+            'company_age_years',
+            'funding_total_usd',
+            'Relationship between Company Age and Total Funding',
+            color_col='market' if 'market' in df.columns else None,
+            size_col='funding_rounds' if 'funding_rounds' in df.columns else None,
+            log_y=True,
+            full_resolution=full_resolution
+        )
+        
+        render_chart(fig, use_container_width=True)
+    
+    
+    show_pca(df, numeric_cols, default_corr_cols, full_resolution)
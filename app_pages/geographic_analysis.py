@@ -2,19 +2,25 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+from aggregations import aggregate
+from data_processor import drop_unused_categories
 from utils import (
+    lazy_tabs,
     format_large_number,
     create_plotly_choropleth,
     create_bar_chart,
-    create_pie_chart
+    create_pie_chart,
+    render_chart
 )
 
-def show_geographic_analysis(df):
+def show_geographic_analysis(df, country_stats):
     """
     Display the geographic analysis page with location-based insights.
     
     Args:
-        df (pd.DataFrame): Filtered dataframe
+        df (pd.DataFrame): Filtered dataframe of the home country
+        country_stats (pd.DataFrame): Worldwide company counts and funding per
+            country and status, see data_processor.get_country_statistics
     """
     st.title("Geographic Distribution Analysis")
     st.write("Explore how startups and funding are distributed across different geographical locations.")
@@ -27,98 +33,102 @@ def show_geographic_analysis(df):
         st.warning("No geographic information available in the dataset.")
         return
     
+    # Country totals are rolled up from the per-country statistics
+    countries = country_stats.groupby('country_code', observed=True)[['size', 'sum']].sum().reset_index()
+    
     # Global map
     st.subheader("Global Distribution of Startups")
     
     # Tabs for different views
-    tab1, tab2 = st.tabs(["Company Count", "Total Funding"])
+    tab1, tab2 = lazy_tabs(["Company Count", "Total Funding"], key='geographic_country_tabs')
     
     with tab1:
-        if 'country_code' in df.columns:
-            country_counts = df['country_code'].drop(index=df[df['country_code'] == 'Unknown'].index).value_counts().reset_index()
-            country_counts.columns = ['country_code', 'count']
+        if tab1.open:
+            if len(countries):
+                country_counts = countries[countries['country_code'] != 'Unknown'][['country_code', 'size']]
+                country_counts = country_counts.sort_values('size', ascending=False)
+                country_counts.columns = ['country_code', 'count']
             
-            # Create world map
-            fig = create_plotly_choropleth(
-                country_counts,
-                'count',
-                'Number of Startups by Country'
-            )
-            st.plotly_chart(fig, use_container_width=True)
+                # Create world map
+                fig = create_plotly_choropleth(
+                    country_counts,
+                    'count',
+                    'Number of Startups by Country'
+                )
+                render_chart(fig, use_container_width=True)
             
-            # Show top countries
-            st.subheader("Top Countries by Number of Startups")
-            top_countries = country_counts.head(15)
+                # Show top countries
+                st.subheader("Top Countries by Number of Startups")
+                top_countries = country_counts.head(15)
             
-            country_fig = create_bar_chart(
-                top_countries,
-                'country_code',
-                'count',
-                'Top 15 Countries by Number of Startups',
-                horizontal=True
-            )
-            st.plotly_chart(country_fig, use_container_width=True)
-        else:
-            st.info("Country information not available in the dataset.")
+                country_fig = create_bar_chart(
+                    top_countries,
+                    'country_code',
+                    'count',
+                    'Top 15 Countries by Number of Startups',
+                    horizontal=True
+                )
+                render_chart(country_fig, use_container_width=True)
+            else:
+                st.info("Country information not available in the dataset.")
     # Status distribution by country
-    if 'country_code' in df.columns and 'status' in df.columns:
+    if len(country_stats):
         # Get top countries
         top_countries = (
-            df['country_code']
-            .drop(index=df[df['country_code'] == 'Unknown'].index)  # Remove 'unknown' entries
-            .value_counts()
-            .nlargest(5)
-            .index
+            countries[countries['country_code'] != 'Unknown']  # Remove 'unknown' entries
+            .nlargest(5, 'size')['country_code']
             .tolist()
         )
         
         # Filter to top countries
-        country_status_df = df[df['country_code'].isin(top_countries)]
+        country_status = country_stats[country_stats['country_code'].isin(top_countries) & country_stats['status'].notna()]
         
         # Create grouped bar chart
-        fig = px.histogram(
-            country_status_df,
+        fig = px.bar(
+            country_status,
             x='country_code',
+            y='size',
             color='status',
             barmode='group',
             title='Distribution of Company Status Across Top 5 Countries',
-            labels={'count': 'Number of Companies', 'country_code': 'Country', 'status': 'Status'}
+            labels={'size': 'Number of Companies', 'country_code': 'Country', 'status': 'Status'}
         )
-        st.plotly_chart(fig, use_container_width=True)            
+        render_chart(fig, use_container_width=True)            
     
     with tab2:
-        if 'country_code' in df.columns and 'funding_total_usd' in df.columns:
-            # Group by country and calculate total funding
-            country_funding = df.groupby('country_code')['funding_total_usd'].sum().reset_index()
+        if tab2.open:
+            if len(countries):
+                # Total funding by country
+                country_funding = countries[['country_code', 'sum']]
+                country_funding.columns = ['country_code', 'funding_total_usd']
             
-            # Create world map
-            fig = create_plotly_choropleth(
-                country_funding,
-                'funding_total_usd',
-                'Total Funding by Country (USD)'
-            )
-            st.plotly_chart(fig, use_container_width=True)
+                # Create world map
+                fig = create_plotly_choropleth(
+                    country_funding,
+                    'funding_total_usd',
+                    'Total Funding by Country (USD)'
+                )
+                render_chart(fig, use_container_width=True)
             
-            # Show top countries by funding
-            st.subheader("Top Countries by Total Funding")
-            top_countries = country_funding.sort_values('funding_total_usd', ascending=False).head(15)
+                # Show top countries by funding
+                st.subheader("Top Countries by Total Funding")
+                top_countries = country_funding.sort_values('funding_total_usd', ascending=False).head(15)
             
-            country_fig = create_bar_chart(
-                top_countries,
-                'country_code',
-                'funding_total_usd',
-                'Top 15 Countries by Total Funding',
-                horizontal=True
-            )
-            st.plotly_chart(country_fig, use_container_width=True)
-        else:
-            st.info("Country or funding information not available in the dataset.")
+                country_fig = create_bar_chart(
+                    top_countries,
+                    'country_code',
+                    'funding_total_usd',
+                    'Top 15 Countries by Total Funding',
+                    horizontal=True
+                )
+                render_chart(country_fig, use_container_width=True)
+            else:
+                st.info("Country or funding information not available in the dataset.")
     
     # India Section
     st.subheader("Distribution of Startups in India")
 
     # Regional analysis
-    df = df[df['country_code'].str.upper() == 'IND']
     if 'region' in df.columns:        
         # Get region counts
         region_counts = df['region'].value_counts().reset_index()
@@ -131,39 +141,38 @@ def show_geographic_analysis(df):
             'Count',
             'Distribution of Startups by Region'
         )
-        st.plotly_chart(region_fig, use_container_width=True)
+        render_chart(region_fig, use_container_width=True)
         
         # Regional funding analysis
         if 'funding_total_usd' in df.columns:
             # Group by region and calculate total/average funding
-            region_funding = df.groupby('region').agg({
-                'funding_total_usd': ['sum', 'mean', 'count']
-            }).reset_index()
-            
+            region_funding = aggregate(df, 'region', aggs=('sum', 'mean', 'count'))
             region_funding.columns = ['region', 'total_funding', 'avg_funding', 'company_count']
             
             # Create tabs for different views
-            tab1, tab2 = st.tabs(["Total Funding by Region", "Average Funding by Region"])
+            tab1, tab2 = lazy_tabs(["Total Funding by Region", "Average Funding by Region"], key='geographic_region_tabs')
             
             with tab1:
-                total_fig = create_bar_chart(
-                    region_funding.sort_values('total_funding', ascending=False),
-                    'region',
-                    'total_funding',
-                    'Total Funding by Region',
-                    horizontal=True
-                )
-                st.plotly_chart(total_fig, use_container_width=True)
+                if tab1.open:
+                    total_fig = create_bar_chart(
+                        region_funding.sort_values('total_funding', ascending=False),
+                        'region',
+                        'total_funding',
+                        'Total Funding by Region',
+                        horizontal=True
+                    )
+                    render_chart(total_fig, use_container_width=True)
             
             with tab2:
-                avg_fig = create_bar_chart(
-                    region_funding.sort_values('avg_funding', ascending=False),
-                    'region',
-                    'avg_funding',
-                    'Average Funding by Region',
-                    horizontal=True
-                )
-                st.plotly_chart(avg_fig, use_container_width=True)
+                if tab2.open:
+                    avg_fig = create_bar_chart(
+                        region_funding.sort_values('avg_funding', ascending=False),
+                        'region',
+                        'avg_funding',
+                        'Average Funding by Region',
+                        horizontal=True
+                    )
+                    render_chart(avg_fig, use_container_width=True)
     else:
         st.info("Region information not available in the dataset.")
     
@@ -184,13 +193,13 @@ def show_geographic_analysis(df):
             'Top 20 Cities by Number of Startups',
             horizontal=True
         )
-        st.plotly_chart(city_fig, use_container_width=True)
+        render_chart(city_fig, use_container_width=True)
         
         # City funding analysis
         if 'funding_total_usd' in df.columns:
             # Group by city and calculate total funding
-            city_funding = df.groupby('city')['funding_total_usd'].sum().reset_index()
-            city_funding = city_funding.sort_values('funding_total_usd', ascending=False).head(20)
+            city_funding = aggregate(df, 'city', aggs=('sum',), top_k=20)
+            city_funding.columns = ['city', 'funding_total_usd']
             
             # Create bar chart
             funding_fig = create_bar_chart(
@@ -200,7 +209,7 @@ def show_geographic_analysis(df):
                 'Top 20 Cities by Total Funding',
                 horizontal=True
             )
-            st.plotly_chart(funding_fig, use_container_width=True)
+            render_chart(funding_fig, use_container_width=True)
     else:
         st.info("City information not available in the dataset.")
     
@@ -214,7 +223,7 @@ def show_geographic_analysis(df):
         top_markets = df['market'].value_counts().nlargest(5).index.tolist()
         
         # Filter to top markets
-        market_region_df = df[df['market'].isin(top_markets)]
+        market_region_df = drop_unused_categories(df[df['market'].isin(top_markets)])
         
         # Create grouped bar chart
         fig = px.histogram(
@@ -225,7 +234,7 @@ def show_geographic_analysis(df):
             title='Distribution of Top 5 Markets Across Regions',
             labels={'count': 'Number of Companies', 'region': 'Region', 'market': 'Market'}
         )
-        st.plotly_chart(fig, use_container_width=True)
+        render_chart(fig, use_container_width=True)
     # Status distribution by country
     if 'region' in df.columns and 'status' in df.columns:
         # Get top regions
@@ -239,7 +248,7 @@ def show_geographic_analysis(df):
         )
         
         # Filter to top countries
-        country_status_df = df[df['region'].isin(top_regions)]
+        country_status_df = drop_unused_categories(df[df['region'].isin(top_regions)])
         
         # Create grouped bar chart
         fig = px.histogram(
@@ -250,5 +259,5 @@ def show_geographic_analysis(df):
             title='Distribution of Company Status Across Top 5 Regions',
             labels={'count': 'Number of Companies', 'region': 'Region', 'status': 'Status'}
         )
-        st.plotly_chart(fig, use_container_width=True)       
+        render_chart(fig, use_container_width=True)       
     
\ No newline at end of file
@@ -2,21 +2,38 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+from aggregations import aggregate
+
 from utils import (
     display_metric_row, 
     format_large_number, 
     create_pie_chart,
     create_bar_chart,
-    create_plotly_choropleth
+    create_plotly_choropleth,
+    load_geometry,
+    INDIA_GEOMETRY,
+    MAP_RENDER_WIDTH,
+    render_chart
 )
+from geo import map_detail, subset_features
+
+# Remote full-resolution state shapes, used when the geometry is not bundled
+INDIA_GEOJSON_URL = "https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson"
 
-def create_india_choropleth(data, value_column, title):    
+def create_india_choropleth(data, value_column, title, width=MAP_RENDER_WIDTH):    
+    # Bundled state shapes at the detail the map width needs, keyed by state name
+    geometry = load_geometry(INDIA_GEOMETRY, map_detail(98 - 68, width))
+    if geometry is not None:
+        geojson, featureidkey = subset_features(geometry, data['state']), "id"
+    else:
+        geojson, featureidkey = INDIA_GEOJSON_URL, "properties.ST_NM"
+    
     # Create India-specific choropleth
     fig = px.choropleth(
         data,
-        geojson="https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson",
+        geojson=geojson,
         locations='state',  # Column in your dataframe with state names
-        featureidkey="properties.ST_NM",  # Key in GeoJSON for state names
+        featureidkey=featureidkey,  # Key in GeoJSON for state names
         color=value_column,
         color_continuous_scale="Viridis",
         range_color=(0, data[value_column].max()),  # CORRECTED: Removed extra parenthesis
@@ -108,7 +125,7 @@ def show_overview(df):
     with col1:
         st.subheader("Company Status Distribution")
         if 'status' in df.columns:
-            status_counts = df['status'].value_counts().reset_index()
+            status_counts = aggregate(df, 'status', None, aggs=('size',), sort_by='size')
             status_counts.columns = ['Status', 'Count']
             
             status_fig = create_pie_chart(
@@ -117,7 +134,7 @@ def show_overview(df):
                 'Count',
                 'Company Status Distribution'
             )
-            st.plotly_chart(status_fig, use_container_width=True)
+            render_chart(status_fig, use_container_width=True)
         else:
             st.info("Status information not available in the dataset.")
     
@@ -125,8 +142,8 @@ def show_overview(df):
     with col2:
         st.subheader("Top Markets by Funding")
         if 'market' in df.columns and 'funding_total_usd' in df.columns:
-            market_funding = df.groupby('market')['funding_total_usd'].sum().reset_index()
-            market_funding = market_funding.sort_values('funding_total_usd', ascending=False).head(10)
+            market_funding = aggregate(df, 'market', aggs=('sum',), top_k=10)
+            market_funding.columns = ['market', 'funding_total_usd']
             
             market_fig = create_bar_chart(
                 market_funding,
@@ -135,7 +152,7 @@ def show_overview(df):
                 'Top 10 Markets by Total Funding',
                 horizontal=True
             )
-            st.plotly_chart(market_fig, use_container_width=True)
+            render_chart(market_fig, use_container_width=True)
         else:
             st.info("Market or funding information not available in the dataset.")
     '''
@@ -151,7 +168,7 @@ def show_overview(df):
                 'count',         # Column with your values
                 'Number of Startups by Indian State'
         )
-        st.plotly_chart(geo_fig, use_container_width=True) 
+        render_chart(geo_fig, use_container_width=True) 
         
        
         
@@ -160,7 +177,7 @@ def show_overview(df):
         #    'count',
         #    'Number of Startups by Country'
         #)
-        #st.plotly_chart(geo_fig, use_container_width=True)
+        #render_chart(geo_fig, use_container_width=True)
         
     else:
         st.info("Country information not available in the dataset.")
@@ -172,7 +189,8 @@ def show_overview(df):
     
     with col1:
         if all(col in df.columns for col in ['funding_rounds', 'funding_total_usd']):
-            funding_by_rounds = df.groupby('funding_rounds')['funding_total_usd'].mean().reset_index()
+            funding_by_rounds = aggregate(df, 'funding_rounds', aggs=('mean',))
+            funding_by_rounds.columns = ['funding_rounds', 'funding_total_usd']
             
             rounds_fig = create_bar_chart(
                 funding_by_rounds,
@@ -180,13 +198,14 @@ def show_overview(df):
                 'funding_total_usd',
                 'Average Funding by Number of Rounds'
             )
-            st.plotly_chart(rounds_fig, use_container_width=True)
+            render_chart(rounds_fig, use_container_width=True)
         else:
             st.info("Funding rounds information not available in the dataset.")
     
     with col2:
         if 'founded_year' in df.columns and 'funding_total_usd' in df.columns:
-            yearly_funding = df.groupby('founded_year')['funding_total_usd'].sum().reset_index()
+            yearly_funding = aggregate(df, 'founded_year', aggs=('sum',))
+            yearly_funding.columns = ['founded_year', 'funding_total_usd']
             
             yearly_fig = px.line(
                 yearly_funding,
@@ -195,7 +214,7 @@ def show_overview(df):
                 title='Total Funding by Founding Year',
                 markers=True
             )
-            st.plotly_chart(yearly_fig, use_container_width=True)
+            render_chart(yearly_fig, use_container_width=True)
         else:
             st.info("Founded year or funding information not available in the dataset.")
     
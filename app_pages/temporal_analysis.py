@@ -2,10 +2,15 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from aggregations import aggregate
+from data_processor import drop_unused_categories
 from utils import (
+    lazy_tabs,
     create_time_series,
     create_bar_chart,
-    create_histogram
+    create_histogram,
+    create_box_plot,
+    render_chart
 )
 
 def show_temporal_analysis(df):
@@ -32,7 +37,7 @@ def show_temporal_analysis(df):
     
     if 'founded_year' in df.columns:
         # Count companies by founding year
-        year_counts = df['founded_year'].value_counts().sort_index().reset_index()
+        year_counts = aggregate(df, 'founded_year', None, aggs=('size',))
         year_counts.columns = ['Year', 'Count']
         
         # Create time series
@@ -42,7 +47,7 @@ def show_temporal_analysis(df):
             'Count',
             'Number of Companies Founded by Year'
         )
-        st.plotly_chart(fig, use_container_width=True)
+        render_chart(fig, use_container_width=True)
         
         # Cumulative companies over time
         year_counts['Cumulative'] = year_counts['Count'].cumsum()
@@ -54,7 +59,7 @@ def show_temporal_analysis(df):
             'Cumulative Number of Companies Founded',
             color='#F97316'
         )
-        st.plotly_chart(cumul_fig, use_container_width=True)
+        render_chart(cumul_fig, use_container_width=True)
         
         # Seasonal patterns (if month data available)
         if 'founded_month' in df.columns:
@@ -63,7 +68,7 @@ def show_temporal_analysis(df):
             #df['Month'] = df['founded_month'].str.split('-').str[1].astype(int)  # Gets the '07' part and converts to 7
 
             # Convert to string, handle nulls, then extract month
-            df['Month'] = (
+            months = (
                 df['founded_month']
                 .astype(str)  # Convert all to string first
                 .str.split('-')
@@ -74,7 +79,7 @@ def show_temporal_analysis(df):
             )
 
             # Count companies by founding month
-            month_counts = df['Month'].value_counts().sort_index().reset_index()
+            month_counts = months.value_counts().sort_index().reset_index()
             month_counts.columns = ['Month', 'Count']
             
             # Map month numbers to names
@@ -101,7 +106,7 @@ def show_temporal_analysis(df):
                 )
             )
             
-            st.plotly_chart(month_fig, use_container_width=True)
+            render_chart(month_fig, use_container_width=True)
         
         # Quarter analysis
         if 'founded_quarter' in df.columns:
@@ -116,7 +121,7 @@ def show_temporal_analysis(df):
                 'Count',
                 'Number of Companies Founded by Quarter'
             )
-            st.plotly_chart(quarter_fig, use_container_width=True)
+            render_chart(quarter_fig, use_container_width=True)
     else:
         st.info("Founding year information not available in the dataset.")
     
@@ -125,47 +130,47 @@ def show_temporal_analysis(df):
     
     if 'founded_year' in df.columns and 'funding_total_usd' in df.columns:
         # Calculate total and average funding by year
-        yearly_funding = df.groupby('founded_year').agg({
-            'funding_total_usd': ['sum', 'mean', 'count']
-        }).reset_index()
-        
+        yearly_funding = aggregate(df, 'founded_year', aggs=('sum', 'mean', 'count'))
         yearly_funding.columns = ['Year', 'Total Funding', 'Average Funding', 'Company Count']
         
         # Create tabs for different views
-        tab1, tab2, tab3 = st.tabs(["Total Funding by Year", "Average Funding by Year", "Funding per Company Count"])
+        tab1, tab2, tab3 = lazy_tabs(["Total Funding by Year", "Average Funding by Year", "Funding per Company Count"], key='temporal_year_tabs')
         
         with tab1:
-            total_fig = create_time_series(
-                yearly_funding,
-                'Year',
-                'Total Funding',
-                'Total Funding by Founding Year'
-            )
-            st.plotly_chart(total_fig, use_container_width=True)
+            if tab1.open:
+                total_fig = create_time_series(
+                    yearly_funding,
+                    'Year',
+                    'Total Funding',
+                    'Total Funding by Founding Year'
+                )
+                render_chart(total_fig, use_container_width=True)
         
         with tab2:
-            avg_fig = create_time_series(
-                yearly_funding,
-                'Year',
-                'Average Funding',
-                'Average Funding by Founding Year',
-                color='#F97316'
-            )
-            st.plotly_chart(avg_fig, use_container_width=True)
+            if tab2.open:
+                avg_fig = create_time_series(
+                    yearly_funding,
+                    'Year',
+                    'Average Funding',
+                    'Average Funding by Founding Year',
+                    color='#F97316'
+                )
+                render_chart(avg_fig, use_container_width=True)
         
         with tab3:
-            # Create scatter plot with size representing company count
-            fig = px.scatter(
-                yearly_funding,
-                x='Year',
-                y='Total Funding',
-                size='Company Count',
-                color='Average Funding',
-                title='Funding Trends by Year (Size = Number of Companies)',
-                labels={'Total Funding': 'Total Funding (USD)'},
-                color_continuous_scale='Viridis'
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            if tab3.open:
+                # Create scatter plot with size representing company count
+                fig = px.scatter(
+                    yearly_funding,
+                    x='Year',
+                    y='Total Funding',
+                    size='Company Count',
+                    color='Average Funding',
+                    title='Funding Trends by Year (Size = Number of Companies)',
+                    labels={'Total Funding': 'Total Funding (USD)'},
+                    color_continuous_scale='Viridis'
+                )
+                render_chart(fig, use_container_width=True)
     else:
         st.info("Founding year or funding information not available in the dataset.")
     
@@ -174,10 +179,10 @@ def show_temporal_analysis(df):
     
     if all(col in df.columns for col in ['founded_at', 'first_funding_at']):
         # Calculate time to first funding in days
-        df['days_to_funding'] = (df['first_funding_at'] - df['founded_at']).dt.days
+        df = df.assign(days_to_funding=(df['first_funding_at'] - df['founded_at']).dt.days)
         
         # Filter out invalid values
-        time_to_funding_df = df[df['days_to_funding'] >= 0].copy()
+        time_to_funding_df = df[df['days_to_funding'] >= 0]
         
         # Calculate years to funding for better visualization
         time_to_funding_df['years_to_funding'] = time_to_funding_df['days_to_funding'] / 365.25
@@ -195,7 +200,7 @@ def show_temporal_analysis(df):
             yaxis_title='Number of Companies'
         )
         
-        st.plotly_chart(fig, use_container_width=True)
+        render_chart(fig, use_container_width=True)
         
         # Time to funding by market
         if 'market' in df.columns:
@@ -203,35 +208,35 @@ def show_temporal_analysis(df):
             top_markets = df['market'].value_counts().nlargest(10).index.tolist()
             
             # Filter to top markets
-            market_time_df = time_to_funding_df[time_to_funding_df['market'].isin(top_markets)].copy()
+            market_time_df = drop_unused_categories(time_to_funding_df[time_to_funding_df['market'].isin(top_markets)])
             
             # Create box plot
-            fig = px.box(
+            fig = create_box_plot(
                 market_time_df,
-                x='market',
-                y='years_to_funding',
-                title='Time to First Funding by Market',
+                'market',
+                'years_to_funding',
+                'Time to First Funding by Market',
                 labels={
                     'market': 'Market',
                     'years_to_funding': 'Years to First Funding'
                 }
             )
-            st.plotly_chart(fig, use_container_width=True)
+            render_chart(fig, use_container_width=True)
         
         # Time to funding by status
         if 'status' in df.columns:
             # Create box plot
-            fig = px.box(
+            fig = create_box_plot(
                 time_to_funding_df,
-                x='status',
-                y='years_to_funding',
-                title='Time to First Funding by Company Status',
+                'status',
+                'years_to_funding',
+                'Time to First Funding by Company Status',
                 labels={
                     'status': 'Company Status',
                     'years_to_funding': 'Years to First Funding'
                 }
             )
-            st.plotly_chart(fig, use_container_width=True)
+            render_chart(fig, use_container_width=True)
     else:
         st.info("Founding or first funding date information not available in the dataset.")
     
@@ -240,10 +245,10 @@ def show_temporal_analysis(df):
     
     if all(col in df.columns for col in ['first_funding_at', 'last_funding_at']):
         # Calculate funding duration in days
-        df['funding_duration_days'] = (df['last_funding_at'] - df['first_funding_at']).dt.days
+        df = df.assign(funding_duration_days=(df['last_funding_at'] - df['first_funding_at']).dt.days)
         
         # Filter out invalid values
-        funding_duration_df = df[df['funding_duration_days'] >= 0].copy()
+        funding_duration_df = df[df['funding_duration_days'] >= 0]
         
         # Calculate funding duration in years for better visualization
         funding_duration_df['funding_duration_years'] = funding_duration_df['funding_duration_days'] / 365.25
@@ -262,7 +267,7 @@ def show_temporal_analysis(df):
             yaxis_title='Number of Companies'
         )
         
-        st.plotly_chart(fig, use_container_width=True)
+        render_chart(fig, use_container_width=True)
         
         # Funding duration by rounds
         if 'funding_rounds' in df.columns:
@@ -282,7 +287,7 @@ def show_temporal_analysis(df):
                 yaxis_title='Average Funding Duration (Years)'
             )
             
-            st.plotly_chart(fig, use_container_width=True)
+            render_chart(fig, use_container_width=True)
     else:
         st.info("First funding or last funding date information not available in the dataset.")
     
@@ -291,7 +296,7 @@ def show_temporal_analysis(df):
     
     if 'founded_year' in df.columns and 'status' in df.columns:
         # Group by year and status
-        year_status = df.groupby(['founded_year', 'status']).size().reset_index(name='count')
+        year_status = df.groupby(['founded_year', 'status'], observed=True).size().reset_index(name='count')
         
         # Create grouped bar chart
         fig = px.bar(
@@ -313,12 +318,12 @@ def show_temporal_analysis(df):
             barmode='group'
         )
         
-        st.plotly_chart(fig, use_container_width=True)
+        render_chart(fig, use_container_width=True)
         
         # Calculate success rate by year (consider IPO or acquisition as success)
         if any(status in df['status'].unique() for status in ['ipo', 'acquired']):
             # Create success column
-            df['success'] = df['status'].isin(['ipo', 'acquired'])
+            df = df.assign(success=df['status'].isin(['ipo', 'acquired']))
             
             # Group by year and calculate success rate
             year_success = df.groupby('founded_year')['success'].mean().reset_index()
@@ -340,6 +345,6 @@ def show_temporal_analysis(df):
                 )
             )
             
-            st.plotly_chart(fig, use_container_width=True)
+            render_chart(fig, use_container_width=True)
     else:
         st.info("Founding year or status information not available in the dataset.")
\ No newline at end of file
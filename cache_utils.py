@@ -0,0 +1,125 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def frame_nbytes(value):
+    """
+    Estimate the memory held by a cached value.
+
+    Args:
+        value: DataFrame, Series or any object with an `nbytes` attribute
+
+    Returns:
+        int: Size in bytes (0 if unknown)
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    return int(getattr(value, 'nbytes', 0))
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache bounded by entries and by memory.
+
+    Streamlit serves every session from its own thread, so a cache shared
+    through st.cache_resource is guarded by a lock. Values larger than the
+    whole memory budget are returned to the caller but not stored.
+    """
+
+    def __init__(self, max_entries=64, max_bytes=256 * 1024 * 1024, sizeof=frame_nbytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """
+        Look up a value and mark it as most recently used.
+
+        Args:
+            key: Hashable cache key
+            default: Returned when the key is not cached
+
+        Returns:
+            The cached value, or default
+        """
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        """
+        Store a value, evicting least recently used entries to stay in budget.
+
+        Args:
+            key: Hashable cache key
+            value: Value to cache
+        """
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return
+
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            while len(self._entries) > self.max_entries or self.nbytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.nbytes -= evicted_size
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for key, computing and storing it if missing.
+
+        Args:
+            key: Hashable cache key
+            compute (callable): Called without arguments on a miss
+
+        Returns:
+            The cached or freshly computed value
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        """
+        Summarize the cache usage.
+
+        Returns:
+            dict: Entries, bytes held, hits and misses
+        """
+        return {
+            'entries': len(self._entries),
+            'bytes': self.nbytes,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
@@ -0,0 +1,222 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from cache_utils import LRUCache
+
+# Normalizations of the co-occurrence counts offered by CategoryTable.cooccurrence
+COOCCURRENCE_MEASURES = ['count', 'lift', 'jaccard']
+
+
+def _product_nbytes(entry):
+    _, product = entry
+    return product.data.nbytes + product.indices.nbytes + product.indptr.nbytes
+
+
+class CategoryTable:
+    """
+    Normalized companies x categories table stored in CSR form.
+
+    The categories of dataset row i are codes[offsets[i]:offsets[i + 1]], and
+    names[code] maps an integer code back to its category name. Rows are
+    positions in the loaded dataset, which has a RangeIndex, so the index of
+    any filtered slice can be passed wherever `rows` is accepted.
+    """
+
+    def __init__(self, offsets, codes, names, max_cached_slices=32):
+        self.offsets = offsets
+        self.codes = codes
+        self.names = names
+        self._cooccurrence_cache = LRUCache(max_entries=max_cached_slices, sizeof=_product_nbytes)
+
+    @classmethod
+    def from_category_list(cls, category_list):
+        """
+        Build the table from the pipe separated category_list column.
+
+        Args:
+            category_list (pd.Series): Values like 'Software|SaaS|Enterprise'
+
+        Returns:
+            CategoryTable: Table with one CSR row per dataset row
+        """
+        n_rows = len(category_list)
+        exploded = (
+            pd.Series(category_list.to_numpy(), index=np.arange(n_rows))
+            .str.strip('|')
+            .str.split('|')
+            .explode()
+            .dropna()
+            .str.strip()
+        )
+
+        codes, names = pd.factorize(exploded, sort=True)
+        row_counts = np.bincount(exploded.index.to_numpy(dtype=np.int64), minlength=n_rows)
+
+        offsets = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum(row_counts, out=offsets[1:])
+
+        return cls(offsets, codes.astype(np.int32), np.asarray(names, dtype=object))
+
+    def counts(self):
+        """
+        Number of categories of every row.
+
+        Returns:
+            np.ndarray: Category count per row
+        """
+        return np.diff(self.offsets)
+
+    def main_categories(self, missing='Unknown'):
+        """
+        First listed category of every row.
+
+        Args:
+            missing (str): Value for rows without categories
+
+        Returns:
+            np.ndarray: Main category name per row
+        """
+        has_categories = self.counts() > 0
+        main = np.full(len(has_categories), missing, dtype=object)
+        main[has_categories] = self.names[self.codes[self.offsets[:-1][has_categories]]]
+        return main
+
+    def pairs(self, rows=None):
+        """
+        List the (row, category code) pairs of a subset of rows.
+
+        Args:
+            rows (array-like, optional): Row positions; defaults to all rows
+
+        Returns:
+            tuple: (local_rows, codes) where local_rows indexes into `rows`
+        """
+        if rows is None:
+            lengths = self.counts()
+            return np.repeat(np.arange(len(lengths)), lengths), self.codes
+
+        rows = np.asarray(rows, dtype=np.int64)
+        starts = self.offsets[rows]
+        lengths = self.offsets[rows + 1] - starts
+
+        local_rows = np.repeat(np.arange(len(rows)), lengths)
+        # Position of every pair inside its row, added to the row's start offset
+        within_row = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return local_rows, self.codes[np.repeat(starts, lengths) + within_row]
+
+    def frequencies(self, rows=None):
+        """
+        Count companies per category.
+
+        Args:
+            rows (array-like, optional): Row positions; defaults to all rows
+
+        Returns:
+            pd.Series: Company count per category name, most frequent first
+        """
+        _, codes = self.pairs(rows)
+        counts = np.bincount(codes, minlength=len(self.names))
+        freq = pd.Series(counts, index=self.names)
+        return freq[freq > 0].sort_values(ascending=False, kind='stable')
+
+    def aggregate(self, values, rows=None):
+        """
+        Aggregate a per-company measure over every category the company has.
+
+        Args:
+            values (array-like): One value per entry of `rows` (or per row)
+            rows (array-like, optional): Row positions; defaults to all rows
+
+        Returns:
+            pd.DataFrame: 'category', 'sum', 'mean' and 'count' columns, where
+                count is the number of companies with a non-missing value
+        """
+        local_rows, codes = self.pairs(rows)
+        pair_values = pd.Series(values).to_numpy(dtype=np.float64, na_value=np.nan)[local_rows]
+        valid = ~np.isnan(pair_values)
+
+        n_names = len(self.names)
+        sums = np.bincount(codes[valid], weights=pair_values[valid], minlength=n_names)
+        counts = np.bincount(codes[valid], minlength=n_names)
+
+        result = pd.DataFrame({'category': self.names, 'sum': sums, 'count': counts})
+        result = result[result['count'] > 0].reset_index(drop=True)
+        result['mean'] = result['sum'] / result['count']
+        return result[['category', 'sum', 'mean', 'count']]
+
+    def incidence(self, rows=None):
+        """
+        Build the binary companies x categories incidence matrix of a subset.
+
+        Args:
+            rows (array-like, optional): Row positions; defaults to all rows
+
+        Returns:
+            scipy.sparse.csr_matrix: One row per entry of `rows`, one column per category
+        """
+        local_rows, codes = self.pairs(rows)
+        n_rows = len(self.offsets) - 1 if rows is None else len(rows)
+
+        matrix = sparse.csr_matrix(
+            (np.ones(len(codes), dtype=np.int32), (local_rows, codes)),
+            shape=(n_rows, len(self.names))
+        )
+        # A category listed twice for the same company still counts once
+        matrix.data = np.minimum(matrix.data, 1)
+        return matrix
+
+    def _cooccurrence_product(self, rows):
+        # X^T X of the slice, memoized by the row positions it was built from
+        # so reruns with the same filters skip the multiplication.
+        rows = None if rows is None else np.asarray(rows, dtype=np.int64)
+        key = 'all' if rows is None else hashlib.sha1(rows.tobytes()).hexdigest()
+
+        def compute():
+            matrix = self.incidence(rows)
+            return matrix.shape[0], (matrix.T @ matrix).tocsr()
+
+        return self._cooccurrence_cache.get_or_compute(key, compute)
+
+    def cooccurrence(self, rows=None, top_n=15, measure='count'):
+        """
+        Category co-occurrence matrix of the most frequent categories.
+
+        Counts come from a single sparse X^T X product, whose diagonal holds
+        the number of companies per category. 'lift' is the observed count
+        over the count expected if categories were independent, and 'jaccard'
+        is the count over the number of companies having either category.
+
+        Args:
+            rows (array-like, optional): Row positions; defaults to all rows
+            top_n (int): Number of most frequent categories to keep
+            measure (str): One of COOCCURRENCE_MEASURES
+
+        Returns:
+            pd.DataFrame: Square matrix indexed by category name on both axes
+        """
+        if measure not in COOCCURRENCE_MEASURES:
+            raise ValueError(f"Unknown co-occurrence measure '{measure}', expected one of {COOCCURRENCE_MEASURES}")
+
+        n_rows, product = self._cooccurrence_product(rows)
+        counts = product.diagonal()
+
+        # Most frequent categories first, ties broken by name like frequencies()
+        order = np.argsort(-counts, kind='stable')
+        top = order[:top_n]
+        top = top[counts[top] > 0]
+
+        matrix = product[top][:, top].toarray()
+        top_counts = counts[top].astype(np.float64)
+
+        if measure == 'lift':
+            expected = np.outer(top_counts, top_counts) / max(n_rows, 1)
+            matrix = matrix / expected
+        elif measure == 'jaccard':
+            union = top_counts[:, None] + top_counts[None, :] - matrix
+            matrix = matrix / union
+
+        names = self.names[top]
+        return pd.DataFrame(matrix, index=names, columns=names)
@@ -0,0 +1,168 @@
+import datetime
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+# Structured log of every chart emitted, one JSON record per line; empty to
+# disable
+CHART_LOG_FILE = os.environ.get('STARTUP_CHART_LOG', '')
+
+# Charts whose serialized figure exceeds CHART_BUDGET_BYTES (0 for no budget)
+# are handled by CHART_BUDGET_POLICY: 'downsample' thins their row-level
+# traces until they fit, 'refuse' shows a warning instead, and 'warn' renders
+# them as they are and only flags them
+CHART_BUDGET_BYTES = int(os.environ.get('STARTUP_CHART_BUDGET_BYTES', '0'))
+CHART_BUDGET_POLICY = os.environ.get('STARTUP_CHART_BUDGET_POLICY', 'downsample')
+BUDGET_POLICIES = ['downsample', 'refuse', 'warn']
+
+# Show the chart metrics of the current run in the sidebar
+DEV_PANEL = os.environ.get('STARTUP_DEV_PANEL', '') not in ('', '0')
+
+# Trace types drawn from one element per row, which can be thinned evenly
+# without changing what the chart shows; aggregated traces are left alone
+ROW_TRACE_TYPES = ['scatter', 'scattergl', 'box', 'violin']
+
+# Attempts to thin a chart before it is refused
+MAX_THINNING_PASSES = 3
+
+_log_lock = threading.Lock()
+
+if CHART_BUDGET_POLICY not in BUDGET_POLICIES:
+    raise ValueError(f"STARTUP_CHART_BUDGET_POLICY must be one of {BUDGET_POLICIES}, got {CHART_BUDGET_POLICY!r}")
+
+
+def metrics_enabled():
+    """
+    Check whether chart emission is measured at all.
+
+    Measuring serializes every figure once more, so it only happens when a
+    log, the developer panel or a budget asks for it.
+
+    Returns:
+        bool: True if any chart metrics consumer is configured
+    """
+    return bool(CHART_LOG_FILE) or DEV_PANEL or CHART_BUDGET_BYTES > 0
+
+
+def serialize_figure(fig):
+    """
+    Serialize a figure the way st.plotly_chart sends it to the browser.
+
+    Args:
+        fig (go.Figure): Figure to serialize
+
+    Returns:
+        tuple: (payload size in bytes, seconds spent serializing)
+    """
+    start = time.perf_counter()
+    spec = pio.to_json(fig, validate=False)
+    return len(spec.encode()), time.perf_counter() - start
+
+
+def figure_points(fig):
+    """
+    Count the data points of a figure's traces.
+
+    Args:
+        fig (go.Figure): Figure to inspect
+
+    Returns:
+        int: Sum over traces of their longest coordinate array
+    """
+    points = 0
+    for trace in fig.data:
+        lengths = [np.size(value) for value in (getattr(trace, attr, None) for attr in ('x', 'y', 'z', 'values', 'locations'))
+                   if value is not None]
+        points += max(lengths, default=0)
+    return points
+
+
+def _thin_trace(trace, fraction):
+    # Keep evenly spaced rows of every per-row array of the trace
+    arrays = {key: value for key, value in trace.items()
+              if isinstance(value, (list, tuple, np.ndarray)) and np.ndim(value) >= 1}
+    n = max((len(value) for value in arrays.values()), default=0)
+    keep = max(int(n * fraction), 1)
+    if n < 2 or keep >= n:
+        return trace
+
+    rows = np.unique(np.linspace(0, n - 1, keep).round().astype(int))
+    thinned = dict(trace)
+    for key, value in arrays.items():
+        if len(value) == n:
+            thinned[key] = value[rows] if isinstance(value, np.ndarray) else [value[i] for i in rows]
+    # Per-point colors and sizes
+    if isinstance(trace.get('marker'), dict):
+        thinned['marker'] = _thin_trace(trace['marker'], fraction)
+    return thinned
+
+
+def thin_figure(fig, fraction):
+    """
+    Keep an evenly spaced fraction of the rows of a figure's row-level traces.
+
+    Args:
+        fig (go.Figure): Figure to thin
+        fraction (float): Share of the rows to keep, in (0, 1)
+
+    Returns:
+        go.Figure: A new figure; fig is left unchanged
+    """
+    spec = fig.to_dict()
+    spec['data'] = [_thin_trace(trace, fraction) if trace.get('type', 'scatter') in ROW_TRACE_TYPES else trace
+                    for trace in spec['data']]
+    return go.Figure(spec)
+
+
+def fit_budget(fig, size, budget):
+    """
+    Thin a figure until its payload fits a byte budget.
+
+    Args:
+        fig (go.Figure): Figure over the budget
+        size (int): Its current payload size in bytes
+        budget (int): Budget in bytes
+
+    Returns:
+        tuple: (figure, payload size); the figure is None when thinning its
+            row-level traces cannot bring it under the budget
+    """
+    thinned = fig
+    for _ in range(MAX_THINNING_PASSES):
+        # Payloads shrink about linearly with the rows kept; aim a bit lower
+        smaller = thin_figure(thinned, 0.9 * budget / size)
+        smaller_size, _ = serialize_figure(smaller)
+        if smaller_size >= size:
+            break
+        thinned, size = smaller, smaller_size
+        if size <= budget:
+            if thinned.layout.title.text:
+                thinned.update_layout(title_text=f"{thinned.layout.title.text} (downsampled)")
+            return thinned, size
+    return None, size
+
+
+def log_chart(record, path=None):
+    """
+    Append a chart record to the structured chart log.
+
+    Args:
+        record (dict): Chart metrics, see utils.render_chart
+        path (str, optional): Log file; defaults to CHART_LOG_FILE
+    """
+    path = path or CHART_LOG_FILE
+    if not path:
+        return
+
+    line = json.dumps({'time': datetime.datetime.now().isoformat(timespec='milliseconds'), **record})
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Sessions render from their own threads; lines must not interleave
+    with _log_lock, open(path, 'a') as f:
+        f.write(line + '\n')
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+
+class CorrelationStats:
+    """
+    Sufficient statistics of the pairwise Pearson correlations of numeric columns.
+
+    For every pair of columns (i, j) the statistics hold, over the rows where
+    both are present, the row count n[i, j], the sums of each column
+    sums[i, j] (of column i) and sums[j, i] (of column j), the sums of squares
+    squares[i, j] and squares[j, i], and the sum of cross-products
+    products[i, j]. They are computed with four matrix products in one pass
+    over the rows, after which the correlation matrix of any subset of the
+    columns is an O(k^2) lookup.
+
+    Columns are shifted and scaled by their mean and standard deviation before
+    accumulating, which leaves correlations unchanged and avoids the
+    cancellation of large sums of squares of funding amounts. Like
+    DataFrame.corr(), each pair uses the rows where both columns are present.
+    """
+
+    def __init__(self, columns, n, sums, squares, products):
+        self.columns = pd.Index(columns)
+        self.n = n
+        self.sums = sums
+        self.squares = squares
+        self.products = products
+
+    @classmethod
+    def from_frame(cls, df, columns=None):
+        """
+        Accumulate the statistics of numeric columns of a frame.
+
+        Args:
+            df (pd.DataFrame): DataFrame with data
+            columns (list, optional): Columns to include; defaults to all
+                numeric columns
+
+        Returns:
+            CorrelationStats: Statistics of the columns
+        """
+        if columns is None:
+            columns = df.select_dtypes(include=['number']).columns.tolist()
+
+        values = np.column_stack([
+            df[col].to_numpy(dtype=np.float64, na_value=np.nan) for col in columns
+        ]) if columns else np.empty((len(df), 0))
+        values[~np.isfinite(values)] = np.nan
+
+        # Standardize each column over its present values
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scale = np.nanstd(values, axis=0) if len(values) else np.ones(len(columns))
+            scale = np.where(scale > 0, scale, 1.0)
+            centered = (values - np.nanmean(values, axis=0)) / scale
+
+        present = np.isfinite(centered)
+        filled = np.where(present, centered, 0.0)
+        mask = present.astype(np.float64)
+
+        return cls(
+            columns,
+            n=mask.T @ mask,
+            sums=filled.T @ mask,
+            squares=(filled ** 2).T @ mask,
+            products=filled.T @ filled,
+        )
+
+    def corr(self, columns=None):
+        """
+        Pearson correlation matrix of a subset of the columns.
+
+        Args:
+            columns (list, optional): Columns to correlate; defaults to all
+
+        Returns:
+            pd.DataFrame: Correlation matrix; NaN for pairs with fewer than two
+                shared rows or without variance
+        """
+        columns = self.columns if columns is None else pd.Index(columns)
+        idx = self.columns.get_indexer(columns)
+        if (idx < 0).any():
+            raise KeyError(f"No correlation statistics for {list(columns[idx < 0])}")
+
+        cells = np.ix_(idx, idx)
+        n = self.n[cells]
+        sums = self.sums[cells]
+        squares = self.squares[cells]
+
+        covariance = n * self.products[cells] - sums * sums.T
+        variance = n * squares - sums ** 2
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = covariance / np.sqrt(variance * variance.T)
+        corr[(n < 2) | (variance <= 0) | (variance.T <= 0)] = np.nan
+        corr = np.clip(corr, -1.0, 1.0)
+
+        # Rounding can leave the diagonal a hair away from 1
+        diagonal = np.diag_indices_from(corr)
+        corr[diagonal] = np.where(np.isnan(corr[diagonal]), np.nan, 1.0)
+
+        return pd.DataFrame(corr, index=columns, columns=columns)
@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+
+# Dimensions and measure of the materialized funding cube
+CUBE_DIMENSIONS = ['founded_year', 'market', 'status', 'region', 'city', 'country_code']
+CUBE_MEASURE = 'funding_total_usd'
+
+# Extra cell dimension telling whether the measure is present, which is what a
+# funding range filter spanning every funding amount selects
+FUNDED = 'funded'
+
+# Additive partials stored per cell, and how cells are rolled up
+CELL_STATS = {'size': 'sum', 'count': 'sum', 'sum': 'sum', 'min': 'min', 'max': 'max'}
+
+
+class FundingCube:
+    """
+    Pre-aggregated count, sum, min and max of funding per combination of
+    CUBE_DIMENSIONS.
+
+    Each cell holds additive partials ('size' rows, 'count' non-missing
+    funding values, 'sum', 'min' and 'max'), so any rollup to fewer
+    dimensions, including means, is computed from the cells alone. Filters
+    that only restrict cube dimensions are applied to the cells too, which
+    keeps chart latency proportional to the number of cells rather than the
+    number of companies.
+    """
+
+    def __init__(self, cells, dimensions=CUBE_DIMENSIONS, measure=CUBE_MEASURE):
+        self.cells = cells
+        self.dimensions = [dim for dim in dimensions if dim in cells.columns]
+        self.measure = measure
+
+    @classmethod
+    def build(cls, df, dimensions=CUBE_DIMENSIONS, measure=CUBE_MEASURE):
+        """
+        Aggregate the company rows of a frame into cube cells.
+
+        Args:
+            df (pd.DataFrame): Preprocessed dataset (or a delta of it)
+            dimensions (list): Columns to keep as cube dimensions
+            measure (str): Numeric column to aggregate
+
+        Returns:
+            FundingCube: Cube with one cell per observed combination
+        """
+        return cls(_cells(df, [dim for dim in dimensions if dim in df.columns], measure), dimensions, measure)
+
+    @property
+    def keys(self):
+        return self.dimensions + [FUNDED]
+
+    def select(self, ranges=None, isin=None):
+        """
+        Cells matching a global filter state, if the cube can answer it.
+
+        Args:
+            ranges (dict, optional): Column -> (low, high) inclusive bounds
+            isin (dict, optional): Column -> list of accepted values
+
+        Returns:
+            pd.DataFrame or None: Matching cells, or None when a filter
+                restricts something other than cube dimensions
+        """
+        cells = self.cells
+        ranges = dict(ranges or {})
+        funding_range = ranges.pop(self.measure, None)
+
+        for col, (low, high) in ranges.items():
+            if col not in self.dimensions:
+                return None
+            # Missing values compare False, whatever the dtype of the keys
+            values = cells[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            cells = cells[(values >= low) & (values <= high)]
+
+        for col, values in (isin or {}).items():
+            if col not in self.dimensions:
+                return None
+            cells = cells[cells[col].isin(values).to_numpy()]
+
+        if funding_range is not None:
+            # The range keeps every company with funding only if it spans the
+            # funding of all the selected cells; narrower ranges need the rows
+            cells = cells[cells[FUNDED].to_numpy()]
+            low, high = funding_range
+            if len(cells) and (cells['min'].min() < low or cells['max'].max() > high):
+                return None
+
+        return cells
+
+    def rollup(self, dimension, cells=None):
+        """
+        Roll cells up to a single dimension.
+
+        Args:
+            dimension (str): Cube dimension to group by
+            cells (pd.DataFrame, optional): Selected cells; defaults to all
+
+        Returns:
+            pd.DataFrame: The dimension column and 'size', 'count', 'sum',
+                'mean', 'min' and 'max' per group
+        """
+        cells = self.cells if cells is None else cells
+        stats = cells.groupby(dimension, observed=True).agg(CELL_STATS)
+        stats['mean'] = stats['sum'] / stats['count']
+        return stats.reset_index()
+
+    def apply_delta(self, removed, added, df):
+        """
+        Update the cells in place for rows removed from and added to the dataset.
+
+        Counts and sums are adjusted additively. Min and max cannot be undone
+        for removed rows, so only the cells that lost rows are re-aggregated
+        from the merged frame.
+
+        Args:
+            removed (pd.DataFrame): Preprocessed rows taken out of the dataset
+            added (pd.DataFrame): Preprocessed rows put into the dataset
+            df (pd.DataFrame): The dataset after the change
+
+        Returns:
+            FundingCube: self
+        """
+        keys = self.keys
+        removed_cells = _cells(removed, self.dimensions, self.measure)
+        added_cells = _cells(added, self.dimensions, self.measure)
+
+        negated = removed_cells.assign(**{col: -removed_cells[col] for col in ['size', 'count', 'sum']},
+                                       min=np.nan, max=np.nan)
+        cells = pd.concat([self.cells, added_cells, negated], ignore_index=True)
+        cells = cells.groupby(keys, dropna=False, sort=False).agg(CELL_STATS).reset_index()
+        cells = cells[cells['size'] > 0]
+
+        if len(removed_cells):
+            # Recompute min and max of the cells that lost rows
+            touched = removed_cells[keys].drop_duplicates()
+            rows = _as_plain(_with_funded(df, self.dimensions, self.measure)).merge(touched, on=keys)
+            exact = _cells(rows, self.dimensions, self.measure)[keys + ['min', 'max']]
+            cells = cells.merge(exact, on=keys, how='left', suffixes=('', '_exact'))
+            was_touched = cells.merge(touched, on=keys, how='left', indicator=True)['_merge'].eq('both').to_numpy()
+            for col in ['min', 'max']:
+                cells[col] = np.where(was_touched, cells[f'{col}_exact'], cells[col])
+            cells = cells.drop(columns=['min_exact', 'max_exact'])
+
+        self.cells = cells.reset_index(drop=True)
+        return self
+
+
+def _with_funded(df, dimensions, measure):
+    return df[dimensions + [measure]].assign(**{FUNDED: df[measure].notna()})
+
+
+def _cells(df, dimensions, measure):
+    rows = _with_funded(df, dimensions, measure)
+    grouped = rows.groupby(dimensions + [FUNDED], observed=True, dropna=False, sort=False)[measure]
+    cells = pd.DataFrame({
+        'size': grouped.size(),
+        'count': grouped.count(),
+        'sum': grouped.sum(),
+        'min': grouped.min(),
+        'max': grouped.max(),
+    })
+    return _as_plain(cells.reset_index())
+
+
+def _as_plain(cells):
+    # Cells keep their keys as plain values: categoricals with different
+    # categories cannot be concatenated or merged reliably, and plain keys
+    # store in Parquet without dictionary bookkeeping
+    return cells.astype({col: object for col in cells.columns if isinstance(cells[col].dtype, pd.CategoricalDtype)})
@@ -0,0 +1,558 @@
+import os
+import glob
+import json
+import shutil
+import hashlib
+from urllib.parse import unquote
+
+import numpy as np
+import pandas as pd
+
+# pyarrow is only needed for the on-disk cache; without it the app simply
+# rebuilds the dataset from the CSV on every cold start.
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    ds = None
+    pq = None
+
+# Bump whenever clean_data/preprocess_data change the shape or meaning of the
+# processed frame, so that caches written by older code are rebuilt.
+CACHE_VERSION = 5
+
+FRAME_FILE = 'frame.parquet'
+KEYS_FILE = 'keys.parquet'
+META_FILE = 'meta.json'
+
+# Rows per Parquet row group of the cached frame. Queries pushed down to the
+# file skip whole row groups whose min/max statistics rule out their filters
+ROW_GROUP_SIZE = 64 * 1024
+
+# New Crunchbase drops are placed as extra CSV files in this directory next to
+# the main CSV and merged into the cache incrementally
+UPDATES_DIR = 'updates'
+KEY_COLUMN = 'permalink'
+
+
+def cache_available():
+    """
+    Check whether the columnar cache can be used in this environment.
+
+    Returns:
+        bool: True if pyarrow is installed
+    """
+    return pq is not None
+
+
+def cache_dir_for(data_file):
+    """
+    Get the cache directory that sits next to a source CSV.
+
+    Args:
+        data_file (str): Path to the source CSV
+
+    Returns:
+        str: Path of the cache directory (e.g. ./data/investments_VC.cache)
+    """
+    base, _ = os.path.splitext(data_file)
+    return base + '.cache'
+
+
+def _hash_file(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_fingerprint(path, previous=None):
+    """
+    Fingerprint a source file by size, mtime and content hash.
+
+    The content hash is only recomputed when size or mtime differ from the
+    previous fingerprint, so an unchanged file costs a single stat call.
+
+    Args:
+        path (str): File to fingerprint
+        previous (dict, optional): Fingerprint stored with the cache
+
+    Returns:
+        dict: Fingerprint with 'size', 'mtime_ns' and 'sha256' keys
+    """
+    stat = os.stat(path)
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    if previous and all(previous.get(k) == fingerprint[k] for k in ('size', 'mtime_ns')):
+        fingerprint['sha256'] = previous.get('sha256')
+    else:
+        fingerprint['sha256'] = _hash_file(path)
+
+    return fingerprint
+
+
+def read_cache_meta(cache_dir):
+    """
+    Read the metadata file of a cache directory.
+
+    Args:
+        cache_dir (str): Cache directory
+
+    Returns:
+        dict or None: Cache metadata, or None if missing or unreadable
+    """
+    try:
+        with open(os.path.join(cache_dir, META_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_cache_meta(cache_dir, meta):
+    """
+    Atomically write the metadata file of a cache directory.
+
+    Args:
+        cache_dir (str): Cache directory
+        meta (dict): Metadata to store
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    meta_path = os.path.join(cache_dir, META_FILE)
+    tmp_path = meta_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, meta_path)
+
+
+def is_cache_valid(data_file, meta):
+    """
+    Check whether cached data still matches its source CSV.
+
+    A touched-but-unchanged file (new mtime, same content hash) is still
+    considered valid and the stored fingerprint is refreshed.
+
+    Args:
+        data_file (str): Path to the source CSV
+        meta (dict): Cache metadata
+
+    Returns:
+        bool: True if the cached frame can be used
+    """
+    if not meta or meta.get('version') != CACHE_VERSION:
+        return False
+
+    # An update that was merged into the cache and then deleted cannot be
+    # taken out again, so the cache has to be rebuilt from the sources
+    updates_dir = updates_dir_for(data_file)
+    for name in meta.get('updates', {}):
+        if not os.path.exists(os.path.join(updates_dir, name)):
+            return False
+
+    previous = meta.get('source', {})
+    current = file_fingerprint(data_file, previous)
+    if current['sha256'] != previous.get('sha256'):
+        return False
+
+    if current != previous:
+        meta['source'] = current
+        write_cache_meta(cache_dir_for(data_file), meta)
+
+    return True
+
+
+def load_cached_frame(data_file):
+    """
+    Load the preprocessed frame for a CSV from its columnar cache.
+
+    Args:
+        data_file (str): Path to the source CSV
+
+    Returns:
+        pd.DataFrame or None: Cached frame, or None if the cache is missing or stale
+    """
+    if not cache_available():
+        return None
+
+    cache_dir = cache_dir_for(data_file)
+    frame_path = os.path.join(cache_dir, FRAME_FILE)
+    meta = read_cache_meta(cache_dir)
+
+    keys_path = os.path.join(cache_dir, KEYS_FILE)
+    if not os.path.exists(frame_path) or not os.path.exists(keys_path):
+        return None
+    if not is_cache_valid(data_file, meta):
+        return None
+
+    try:
+        return pq.read_table(frame_path).to_pandas()
+    except (OSError, pa.ArrowException) as e:
+        print(f"Ignoring unreadable cache {frame_path}: {e}")
+        return None
+
+
+def cached_frame_path(data_file):
+    """
+    Get the path of the cached frame of a CSV, if it can be read in place.
+
+    Args:
+        data_file (str): Path to the source CSV
+
+    Returns:
+        str or None: Path of the Parquet frame, or None if it is missing or stale
+    """
+    if not cache_available():
+        return None
+
+    cache_dir = cache_dir_for(data_file)
+    frame_path = os.path.join(cache_dir, FRAME_FILE)
+    if not os.path.exists(frame_path) or not is_cache_valid(data_file, read_cache_meta(cache_dir)):
+        return None
+    return frame_path
+
+
+def save_cached_frame(df, data_file, keys=None, updates=None):
+    """
+    Write a preprocessed frame to the columnar cache next to its CSV.
+
+    Args:
+        df (pd.DataFrame): Preprocessed dataframe
+        data_file (str): Path to the source CSV the frame was built from
+        keys (pd.DataFrame, optional): Row keys of the sources, see row_keys
+        updates (dict, optional): Fingerprints of the update files merged into df
+    """
+    if not cache_available():
+        print("pyarrow is not installed, skipping the dataset cache.")
+        return
+
+    cache_dir = cache_dir_for(data_file)
+    os.makedirs(cache_dir, exist_ok=True)
+    frame_path = os.path.join(cache_dir, FRAME_FILE)
+    tmp_path = frame_path + '.tmp'
+
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_SIZE)
+        os.replace(tmp_path, frame_path)
+        if keys is not None:
+            save_row_keys(keys, cache_dir)
+    except (OSError, pa.ArrowException) as e:
+        print(f"Could not write dataset cache {frame_path}: {e}")
+        return
+
+    # Aggregates stored with the previous frame no longer match it
+    write_cache_meta(cache_dir, {
+        'version': CACHE_VERSION,
+        'source': file_fingerprint(data_file),
+        'updates': updates or {},
+        'aggregates': [],
+        'rows': len(df),
+    })
+
+
+def _chunk_schema(table):
+    # A column that is entirely null in the first chunk has no arrow type yet;
+    # the only columns that can be all-null in the processed frame are strings.
+    # Categorical codes are widened so later chunks with more categories fit.
+    fields = []
+    for field in table.schema:
+        if pa.types.is_null(field.type):
+            field = pa.field(field.name, pa.string())
+        elif pa.types.is_dictionary(field.type):
+            field = pa.field(field.name, pa.dictionary(pa.int32(), field.type.value_type))
+        fields.append(field)
+    return pa.schema(fields, metadata=table.schema.metadata)
+
+
+def _chunk_to_table(df, schema):
+    # Make a later chunk conform to the schema of the first one: all-NaN string
+    # columns come back from pandas as float64, and integer columns become
+    # float64 as soon as a chunk contains a missing value.
+    for field in schema:
+        if field.name not in df.columns:
+            continue
+        col = df[field.name]
+        is_number_field = pa.types.is_floating(field.type) or pa.types.is_integer(field.type)
+        if not is_number_field and pd.api.types.is_numeric_dtype(col) and not pd.api.types.is_bool_dtype(col):
+            df[field.name] = col.astype(object)
+        elif pa.types.is_integer(field.type) and pd.api.types.is_float_dtype(col):
+            df[field.name] = col.astype('Int64')
+
+    return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+
+def save_cached_chunks(chunks, data_file, keys=None):
+    """
+    Stream preprocessed chunks into the columnar cache next to their CSV.
+
+    Each chunk is written as its own Parquet row group as soon as it arrives,
+    so only one chunk is ever held in memory during ingestion.
+
+    Args:
+        chunks (iterable): Preprocessed dataframes, in source order
+        data_file (str): Path to the source CSV the chunks were built from
+        keys (list, optional): Filled with the row keys of each chunk while
+            it is consumed; written next to the frame once all chunks are done
+
+    Returns:
+        int: Number of rows written
+    """
+    cache_dir = cache_dir_for(data_file)
+    os.makedirs(cache_dir, exist_ok=True)
+    frame_path = os.path.join(cache_dir, FRAME_FILE)
+    tmp_path = frame_path + '.tmp'
+
+    writer = None
+    rows = 0
+    try:
+        for chunk in chunks:
+            if writer is None:
+                schema = _chunk_schema(pa.Table.from_pandas(chunk, preserve_index=False))
+                writer = pq.ParquetWriter(tmp_path, schema)
+            writer.write_table(_chunk_to_table(chunk, schema), row_group_size=ROW_GROUP_SIZE)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is None:
+        return 0
+
+    os.replace(tmp_path, frame_path)
+    if keys is not None:
+        save_row_keys(pd.concat(keys, ignore_index=True), cache_dir)
+    write_cache_meta(cache_dir, {
+        'version': CACHE_VERSION,
+        'source': file_fingerprint(data_file),
+        'updates': {},
+        'aggregates': [],
+        'rows': rows,
+    })
+
+    return rows
+
+
+def row_keys(raw):
+    """
+    Key every raw source row by its permalink and a hash of its contents.
+
+    Floats are hashed at single precision so that the same row parsed by the
+    pyarrow and the C CSV reader, which may differ in the last bit, gets the
+    same hash.
+
+    Args:
+        raw (pd.DataFrame): Raw rows as returned by read_investments_csv
+
+    Returns:
+        pd.DataFrame: 'permalink' and 'row_hash' (int64) per raw row, with
+            the raw index
+    """
+    float_cols = raw.select_dtypes(include='float64').columns
+    hashed = raw.astype({col: 'float32' for col in float_cols})
+    hashes = pd.util.hash_pandas_object(hashed, index=False).to_numpy().view(np.int64)
+
+    return pd.DataFrame({
+        KEY_COLUMN: raw[KEY_COLUMN].to_numpy() if KEY_COLUMN in raw.columns else None,
+        'row_hash': hashes,
+    }, index=raw.index)
+
+
+def save_row_keys(keys, cache_dir):
+    """
+    Write the row keys of the cached frame.
+
+    Args:
+        keys (pd.DataFrame): 'permalink', 'row_hash' and 'frame_row' per source
+            row, where frame_row is the row position in the cached frame or -1
+            if cleaning dropped the row
+        cache_dir (str): Cache directory
+    """
+    keys_path = os.path.join(cache_dir, KEYS_FILE)
+    tmp_path = keys_path + '.tmp'
+    pq.write_table(pa.Table.from_pandas(keys, preserve_index=False), tmp_path)
+    os.replace(tmp_path, keys_path)
+
+
+def load_row_keys(data_file):
+    """
+    Read the row keys stored with the cached frame of a CSV.
+
+    Args:
+        data_file (str): Path to the source CSV
+
+    Returns:
+        pd.DataFrame: Row keys, see save_row_keys
+    """
+    return pq.read_table(os.path.join(cache_dir_for(data_file), KEYS_FILE)).to_pandas()
+
+
+def updates_dir_for(data_file):
+    """
+    Get the directory holding incremental drops for a source CSV.
+
+    Args:
+        data_file (str): Path to the source CSV
+
+    Returns:
+        str: Path of the updates directory (e.g. ./data/updates)
+    """
+    return os.path.join(os.path.dirname(data_file), UPDATES_DIR)
+
+
+def pending_updates(data_file, applied):
+    """
+    Find update files that are new or changed since they were last merged.
+
+    Files are returned in name order, so drops named by date apply oldest first.
+
+    Args:
+        data_file (str): Path to the source CSV
+        applied (dict): Fingerprints of the update files already merged, by name
+
+    Returns:
+        dict: Fingerprint of every pending update file, by path
+    """
+    pending = {}
+    for path in sorted(glob.glob(os.path.join(updates_dir_for(data_file), '*.csv'))):
+        previous = applied.get(os.path.basename(path))
+        fingerprint = file_fingerprint(path, previous)
+        if not previous or fingerprint['sha256'] != previous.get('sha256'):
+            pending[path] = fingerprint
+    return pending
+
+
+def save_cached_aggregate(table, name, data_file):
+    """
+    Store a table precomputed from the cached frame next to it.
+
+    The aggregate stays valid until the frame is written again, which resets
+    the list of aggregates in the cache meta.
+
+    Args:
+        table (pd.DataFrame): Precomputed table
+        name (str): Name of the aggregate, used as file name
+        data_file (str): Path to the source CSV
+    """
+    if not cache_available():
+        return
+
+    cache_dir = cache_dir_for(data_file)
+    meta = read_cache_meta(cache_dir)
+    if not meta:
+        return
+
+    path = os.path.join(cache_dir, name + '.parquet')
+    tmp_path = path + '.tmp'
+    try:
+        pq.write_table(pa.Table.from_pandas(table, preserve_index=False), tmp_path)
+        os.replace(tmp_path, path)
+    except (OSError, pa.ArrowException) as e:
+        print(f"Could not write cached aggregate {path}: {e}")
+        return
+
+    meta['aggregates'] = sorted(set(meta.get('aggregates', [])) | {name})
+    write_cache_meta(cache_dir, meta)
+
+
+def load_cached_aggregate(name, data_file):
+    """
+    Load a table precomputed from the cached frame.
+
+    Args:
+        name (str): Name of the aggregate
+        data_file (str): Path to the source CSV
+
+    Returns:
+        pd.DataFrame or None: The table, or None if missing or stale
+    """
+    if not cache_available():
+        return None
+
+    cache_dir = cache_dir_for(data_file)
+    meta = read_cache_meta(cache_dir)
+    if not meta or name not in meta.get('aggregates', []) or not is_cache_valid(data_file, meta):
+        return None
+
+    try:
+        return pq.read_table(os.path.join(cache_dir, name + '.parquet')).to_pandas()
+    except (OSError, pa.ArrowException) as e:
+        print(f"Ignoring unreadable cached aggregate {name}: {e}")
+        return None
+
+
+def _partitions_name(column):
+    return f'by_{column}'
+
+
+def save_cached_partitions(data_file, column):
+    """
+    Split the cached frame into one Parquet directory per value of a column.
+
+    The frame is streamed batch by batch into hive style directories
+    (e.g. by_country_code/country_code=IND/), so partitioning never loads the
+    whole dataset. Like aggregates, partitions stay valid until the frame is
+    written again. Rows with a missing value are not kept in any partition.
+
+    Args:
+        data_file (str): Path to the source CSV
+        column (str): Column to partition by
+    """
+    if not cache_available():
+        return
+
+    cache_dir = cache_dir_for(data_file)
+    meta = read_cache_meta(cache_dir)
+    frame_path = os.path.join(cache_dir, FRAME_FILE)
+    if not meta or not os.path.exists(frame_path):
+        return
+
+    name = _partitions_name(column)
+    partitions_dir = os.path.join(cache_dir, name)
+    tmp_dir = partitions_dir + '.tmp'
+    try:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        source = ds.dataset(frame_path, format='parquet')
+        partitioning = ds.partitioning(pa.schema([source.schema.field(column)]), flavor='hive')
+        ds.write_dataset(source, tmp_dir, format='parquet', partitioning=partitioning,
+                         basename_template='part-{i}.parquet', max_partitions=4096)
+        shutil.rmtree(partitions_dir, ignore_errors=True)
+        os.replace(tmp_dir, partitions_dir)
+    except (OSError, pa.ArrowException) as e:
+        print(f"Could not write cached partitions {partitions_dir}: {e}")
+        return
+
+    meta['aggregates'] = sorted(set(meta.get('aggregates', [])) | {name})
+    write_cache_meta(cache_dir, meta)
+
+
+def load_cached_partitions(data_file, column):
+    """
+    List the cached partitions of the frame by a column.
+
+    Args:
+        data_file (str): Path to the source CSV
+        column (str): Column the frame was partitioned by
+
+    Returns:
+        dict or None: Directory of each partition, by column value, or None
+            if the partitions are missing or stale
+    """
+    if not cache_available():
+        return None
+
+    cache_dir = cache_dir_for(data_file)
+    meta = read_cache_meta(cache_dir)
+    name = _partitions_name(column)
+    if not meta or name not in meta.get('aggregates', []) or not is_cache_valid(data_file, meta):
+        return None
+
+    partitions_dir = os.path.join(cache_dir, name)
+    prefix = column + '='
+    partitions = {}
+    for entry in sorted(os.listdir(partitions_dir)) if os.path.isdir(partitions_dir) else []:
+        value = unquote(entry[len(prefix):])
+        if entry.startswith(prefix) and value != '__HIVE_DEFAULT_PARTITION__':
+            partitions[value] = os.path.join(partitions_dir, entry)
+    return partitions
@@ -5,70 +5,691 @@ import os
 import json
 from datetime import datetime
 
-@st.cache_data
-def load_data():
+from category_table import CategoryTable
+from cube import FundingCube, CUBE_DIMENSIONS, CUBE_MEASURE
+from aggregations import register_slice
+from cache_utils import LRUCache
+from filters import (
+    FilterIndex,
+    filter_key,
+    build_filter_catalogue,
+    RANGE_FILTER_COLS,
+    CATEGORICAL_FILTER_COLS
+)
+from sql_backend import SQLBackend, sql_available
+from partitions import group_statistics, partitioned_statistics
+from data_cache import (
+    cache_available,
+    cache_dir_for,
+    cached_frame_path,
+    read_cache_meta,
+    load_cached_frame,
+    save_cached_frame,
+    save_cached_chunks,
+    row_keys,
+    load_row_keys,
+    pending_updates,
+    save_cached_aggregate,
+    load_cached_aggregate,
+    save_cached_partitions,
+    load_cached_partitions,
+    KEY_COLUMN
+)
+
+# The loaded dataset is shared read-only by every session. Copy-on-write makes
+# slices, filters and assign() on it lightweight views, and guarantees that
+# columns derived by a page never write into the shared frame.
+pd.set_option('mode.copy_on_write', True)
+
+# CSVs larger than this are ingested in chunks of CHUNK_SIZE rows
+STREAMING_THRESHOLD_BYTES = 256 * 1024 * 1024
+CHUNK_SIZE = 100_000
+
+FUNDING_COLS = [
+    'funding_total_usd', 'seed', 'venture', 'equity_crowdfunding',
+    'undisclosed', 'convertible_note', 'debt_financing', 'angel',
+    'grant', 'private_equity', 'post_ipo_equity', 'post_ipo_debt',
+    'secondary_market', 'product_crowdfunding', 'round_A', 'round_B',
+    'round_C', 'round_D', 'round_E', 'round_F', 'round_G', 'round_H'
+]
+
+# Declarative schema of the investments CSV, keyed by the stripped column name.
+# Each column is converted to its final type exactly once, at parse time:
+#   'str'          kept as text
+#   'float64'      parsed as a number by the CSV reader
+#   'money'        text like " 1,750,000 " or " - ", converted in one vectorized step
+#   ('date', fmt)  text parsed to datetime with the given format
+INVESTMENTS_SCHEMA = {
+    'permalink': 'str',
+    'name': 'str',
+    'homepage_url': 'str',
+    'category_list': 'str',
+    'market': 'str',
+    'funding_total_usd': 'money',
+    'status': 'str',
+    'country_code': 'str',
+    'state_code': 'str',
+    'region': 'str',
+    'city': 'str',
+    'funding_rounds': 'float64',
+    'founded_at': ('date', '%Y-%m-%d'),
+    'founded_month': ('date', '%Y-%m'),
+    'founded_quarter': 'str',
+    'founded_year': 'float64',
+    'first_funding_at': ('date', '%Y-%m-%d'),
+    'last_funding_at': ('date', '%Y-%m-%d'),
+    **{col: 'float64' for col in FUNDING_COLS if col != 'funding_total_usd'},
+}
+
+# Compact in-memory dtypes applied at the end of preprocessing
+CATEGORICAL_COLS = ['country_code', 'state_code', 'region', 'city', 'market', 'status', 'main_category']
+ROUND_COLS = [col for col in FUNDING_COLS if col != 'funding_total_usd']
+SMALL_INT_COLS = {'founded_year': 'Int16', 'funding_rounds': 'Int16', 'category_count': 'Int16'}
+
+# Budget of the filtered-slice cache shared by all sessions
+SLICE_CACHE_MAX_ENTRIES = 32
+SLICE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+DATA_FILE = './data/investments_VC.csv'
+
+# Name of the funding cube stored with the dataset cache
+CUBE_CACHE_NAME = 'cube'
+
+# Engine answering the global filters: 'pandas' filters the in-memory frame,
+# 'duckdb' runs filters and aggregations as SQL against the Parquet cache
+QUERY_ENGINE = os.environ.get('STARTUP_QUERY_ENGINE', 'pandas')
+
+# Column the cached dataset is partitioned by for the worldwide statistics of
+# the Geographic Distribution page, and the column they are broken down by
+PARTITION_COLUMN = 'country_code'
+PARTITION_BREAKDOWN = 'status'
+
+# Tokens the export uses for missing values, on top of pandas' defaults
+NA_TOKENS = ['-']
+THOUSANDS_SEPARATOR = ','
+
+@st.cache_resource
+def load_data(streaming=None):
     """
     Loads the startup dataset, handles missing values, converts data types, and performs initial cleaning.
 
+    The fully preprocessed frame is cached as Parquet next to the CSV and reused
+    until the CSV changes, so only the first cold start pays for cleaning.
+
+    The returned frame is a single object shared by all sessions without
+    copying. Treat it as read-only: filter it, or add per-page columns with
+    df.assign(), which under copy-on-write creates a lightweight overlay.
+
+    Args:
+        streaming (bool, optional): Ingest the CSV chunk by chunk with bounded
+            memory. Defaults to streaming only for files larger than
+            STREAMING_THRESHOLD_BYTES.
+
     Returns:
         pd.DataFrame: The preprocessed DataFrame.
     """
     # Check if data file exists
-    data_file = './data/investments_VC.csv'
+    data_file = DATA_FILE
     
     # For demonstration purposes, create sample data if file doesn't exist
     if not os.path.exists(data_file):
         st.warning("Sample data is being used. Please upload the actual dataset.")
         df = create_sample_data()
+        df = clean_data(df)
+        df = preprocess_data(df)
+        return df.reset_index(drop=True)
+
+    # Reuse the columnar cache if it still matches the CSV
+    df = load_cached_frame(data_file)
+    if df is not None:
+        keys = load_row_keys(data_file)
+        applied = read_cache_meta(cache_dir_for(data_file)).get('updates', {})
     else:
-        # Read CSV with proper handling of number formatting
-        df = pd.read_csv(data_file)
-        
-        # Convert funding columns to numeric, removing any currency symbols and commas
-        funding_cols = [
-            'funding_total_usd', 'seed', 'venture', 'equity_crowdfunding',
-            'undisclosed', 'convertible_note', 'debt_financing', 'angel',
-            'grant', 'private_equity', 'post_ipo_equity', 'post_ipo_debt',
-            'secondary_market', 'product_crowdfunding', 'round_A', 'round_B',
-            'round_C', 'round_D', 'round_E', 'round_F', 'round_G', 'round_H'
-        ]
-        
-        for col in funding_cols:
-            if col in df.columns:
-                # Remove commas and convert to numeric
-                df[col] = df[col].astype(str).str.replace(',', '').astype(float)
-             
-    
+        df, keys = build_frame(data_file, streaming)
+        applied = {}
+
+    # Merge new or changed rows from the incremental drops, if any
+    updates = pending_updates(data_file, applied)
+    if updates:
+        # The stored cube is updated from the delta rather than rebuilt
+        cube_cells = load_cached_aggregate(CUBE_CACHE_NAME, data_file)
+        df, keys, delta = merge_updates(df, keys, updates)
+        applied.update({os.path.basename(path): fingerprint for path, fingerprint in updates.items()})
+        save_cached_frame(df, data_file, keys, applied)
+        if cube_cells is not None:
+            cube = FundingCube(cube_cells).apply_delta(delta['removed'], delta['added'], df)
+            save_cached_aggregate(cube.cells, CUBE_CACHE_NAME, data_file)
+
+    return restore_cached_columns(df)
+
+def build_frame(data_file, streaming=None):
+    """
+    Build the preprocessed frame from scratch and write it to the cache.
+
+    Args:
+        data_file (str): Path to the CSV file
+        streaming (bool, optional): See load_data
+
+    Returns:
+        tuple: (df, keys) with the preprocessed frame and its row keys
+    """
+    if streaming is None:
+        streaming = os.path.getsize(data_file) > STREAMING_THRESHOLD_BYTES
+
+    # Large files are cleaned chunk by chunk straight into the cache and then
+    # read back as typed columns
+    if streaming and cache_available():
+        ingest_csv_in_chunks(data_file)
+        return load_cached_frame(data_file), load_row_keys(data_file)
+
+    df = read_investments_csv(data_file)
+    keys = row_keys(df)
+
     # Preprocess the data
     
     df = clean_data(df)
     df = preprocess_data(df)
-    
+    keys['frame_row'] = _frame_rows(keys.index, df.index, 0)
+    df = df.reset_index(drop=True)
+
+    save_cached_frame(df, data_file, keys.reset_index(drop=True))
+
+    return df, keys.reset_index(drop=True)
+
+def _frame_rows(raw_index, kept_index, start):
+    # Position of each raw row in the cleaned frame, or -1 if cleaning dropped it
+    positions = pd.Series(np.arange(start, start + len(kept_index)), index=kept_index)
+    return positions.reindex(raw_index, fill_value=-1).to_numpy()
+
+@st.cache_resource
+def load_category_table():
+    """
+    Build the companies x categories table of the shared dataset.
+
+    Pages look up the categories of a filtered slice by passing its index,
+    which holds row positions in the dataset returned by load_data.
+
+    Returns:
+        CategoryTable: CSR table of category codes per company
+    """
+    return CategoryTable.from_category_list(_dataset_columns(['category_list'])['category_list'])
+
+@st.cache_resource
+def load_filter_index():
+    """
+    Build the index used to apply the sidebar filters to the shared dataset.
+
+    Returns:
+        FilterIndex: Sorted range columns and per-category row positions
+    """
+    return FilterIndex(load_data())
+
+@st.cache_resource
+def load_filter_catalogue():
+    """
+    Build the metadata the sidebar filter widgets are rendered from.
+
+    Returns:
+        dict: Ranges, top-k lists and distinct values, see build_filter_catalogue
+    """
+    return build_filter_catalogue(_dataset_columns(RANGE_FILTER_COLS + CATEGORICAL_FILTER_COLS))
+
+@st.cache_resource
+def load_cube():
+    """
+    Load the materialized funding cube of the shared dataset.
+
+    The cube is stored with the dataset cache and only rebuilt from the
+    company rows when the cache was rebuilt.
+
+    Returns:
+        FundingCube: Count, sum, min and max of funding per dimension combination
+    """
+    has_source = os.path.exists(DATA_FILE)
+    cells = load_cached_aggregate(CUBE_CACHE_NAME, DATA_FILE) if has_source else None
+    if cells is not None:
+        return FundingCube(cells)
+
+    cube = FundingCube.build(_dataset_columns(CUBE_DIMENSIONS + [CUBE_MEASURE]))
+    if has_source:
+        save_cached_aggregate(cube.cells, CUBE_CACHE_NAME, DATA_FILE)
+    return cube
+
+@st.cache_resource
+def load_sql_backend():
+    """
+    Open the SQL engine over the cached dataset when QUERY_ENGINE is 'duckdb'.
+
+    The engine reads the Parquet cache in place, so the full dataset is only
+    loaded into memory when the cache has to be built or updated first.
+
+    Returns:
+        SQLBackend or None: The engine, or None if it is disabled, duckdb is
+            not installed or there is no dataset file to cache
+    """
+    if QUERY_ENGINE != 'duckdb':
+        return None
+    if not sql_available():
+        print("duckdb is not installed, filtering the in-memory dataset instead.")
+        return None
+    frame_path = _cached_frame_path()
+    return SQLBackend(frame_path) if frame_path is not None else None
+
+def _cached_frame_path():
+    # The cache is built, or pending updates merged into it, by loading the
+    # dataset once; afterwards it can be read in place
+    if not os.path.exists(DATA_FILE):
+        return None
+
+    frame_path = cached_frame_path(DATA_FILE)
+    if frame_path is None or pending_updates(DATA_FILE, read_cache_meta(cache_dir_for(DATA_FILE)).get('updates', {})):
+        load_data()
+        frame_path = cached_frame_path(DATA_FILE)
+    return frame_path
+
+def _dataset_columns(columns):
+    # Only the named columns are read when the SQL backend is enabled
+    backend = load_sql_backend()
+    if backend is not None:
+        return backend.select(columns=[col for col in columns if col in backend.columns])
+
+    df = load_data()
+    return df[[col for col in columns if col in df.columns]]
+
+@st.cache_resource
+def load_partitions():
+    """
+    Partition the cached dataset by PARTITION_COLUMN.
+
+    The partitions are written once per cache build by streaming the cached
+    frame, so they are available without loading the dataset.
+
+    Returns:
+        dict or None: Directory of each partition, by value, or None if the
+            dataset has no cache
+    """
+    if _cached_frame_path() is None:
+        return None
+
+    partitions = load_cached_partitions(DATA_FILE, PARTITION_COLUMN)
+    if partitions is None:
+        save_cached_partitions(DATA_FILE, PARTITION_COLUMN)
+        partitions = load_cached_partitions(DATA_FILE, PARTITION_COLUMN)
+    return partitions
+
+@st.cache_resource
+def load_slice_cache():
+    """
+    Create the process-wide cache of filtered slices and statistics.
+
+    Returns:
+        LRUCache: Values keyed by filter state, bounded by SLICE_CACHE_MAX_ENTRIES
+            and SLICE_CACHE_MAX_BYTES
+    """
+    return LRUCache(max_entries=SLICE_CACHE_MAX_ENTRIES, max_bytes=SLICE_CACHE_MAX_BYTES)
+
+def get_filtered_slice(ranges=None, isin=None):
+    """
+    Get the rows of the dataset matching the global filters.
+
+    Slices are memoized under a canonical key of the filter state, so page
+    navigation and widget clicks that leave the filters unchanged reuse the
+    slice from an earlier run. Like the dataset, slices are shared and must be
+    treated as read-only.
+
+    Args:
+        ranges (dict, optional): Column -> (low, high) inclusive bounds
+        isin (dict, optional): Column -> list of accepted values
+
+    Returns:
+        pd.DataFrame: Filtered dataframe with unused categories removed
+    """
+    def compute():
+        backend = load_sql_backend()
+        if backend is not None:
+            # The filters are pushed down to the Parquet cache
+            df_slice = restore_cached_columns(backend.select(ranges, isin))
+        else:
+            rows = load_filter_index().select(ranges, isin)
+            df_slice = load_data().take(rows)
+        df_slice = drop_unused_categories(df_slice)
+        # Let aggregations on this slice be answered from the cube or the backend
+        register_slice(df_slice, load_cube(), ranges, isin, backend)
+        return df_slice
+
+    return load_slice_cache().get_or_compute(filter_key(ranges, isin), compute)
+
+def get_country_statistics(ranges=None, isin=None):
+    """
+    Get worldwide statistics per country for the global filters.
+
+    The statistics are aggregated partition by partition from the cached
+    dataset, so the rows of every country are never loaded into one frame.
+    Without a cache they are aggregated from the in-memory dataset.
+
+    Args:
+        ranges (dict, optional): Column -> (low, high) inclusive bounds
+        isin (dict, optional): Column -> list of accepted values
+
+    Returns:
+        pd.DataFrame: PARTITION_COLUMN, PARTITION_BREAKDOWN, 'size', 'count'
+            and 'sum' of funding per group, see partitions.group_statistics
+    """
+    def compute():
+        partitions = load_partitions()
+        if partitions is not None:
+            return partitioned_statistics(partitions, PARTITION_COLUMN, PARTITION_BREAKDOWN,
+                                          ranges=ranges, isin=isin)
+
+        df_slice = get_filtered_slice(ranges, isin)
+        return group_statistics(df_slice, [PARTITION_COLUMN, PARTITION_BREAKDOWN])
+
+    key = ('country_statistics',) + filter_key(ranges, isin)
+    return load_slice_cache().get_or_compute(key, compute)
+
+def ingest_csv_in_chunks(data_file, chunksize=CHUNK_SIZE):
+    """
+    Clean and preprocess a CSV chunk by chunk, writing each chunk to the cache.
+
+    Peak memory is bounded by the chunk size rather than the file size.
+
+    Args:
+        data_file (str): Path to the CSV file
+        chunksize (int): Number of CSV rows per chunk
+
+    Returns:
+        int: Number of rows written to the cache
+    """
+    keys = []
+
+    def processed_chunks():
+        rows = 0
+        for chunk in read_investments_csv(data_file, chunksize=chunksize):
+            chunk_keys = row_keys(chunk)
+            chunk = clean_data(chunk, verbose=False)
+            chunk = preprocess_data(chunk, verbose=False)
+            chunk_keys['frame_row'] = _frame_rows(chunk_keys.index, chunk.index, rows)
+            keys.append(chunk_keys)
+            rows += len(chunk)
+            yield chunk
+
+    rows = save_cached_chunks(processed_chunks(), data_file, keys)
+    print(f"Streamed {rows} rows from {data_file} into the dataset cache")
+    return rows
+
+def merge_updates(df, keys, updates):
+    """
+    Merge incremental CSV drops into the preprocessed frame.
+
+    Rows are matched to existing companies by permalink. Only rows that are new
+    or whose contents hash differs from the stored one are cleaned and
+    preprocessed, so the work done is proportional to the size of the change.
+
+    Args:
+        df (pd.DataFrame): Preprocessed frame
+        keys (pd.DataFrame): Row keys of df, see data_cache.save_row_keys
+        updates (iterable): Paths of the update CSVs, applied in order
+
+    Returns:
+        tuple: (df, keys, delta) where delta is a dict with the 'removed' and
+            'added' preprocessed rows, for updating aggregates built on df
+    """
+    removed, added = [], []
+    for path in updates:
+        df, keys, delta = merge_delta(df, keys, read_investments_csv(path))
+        removed.append(delta['removed'])
+        added.append(delta['added'])
+        print(f"Merged {path}: {len(delta['added'])} rows added or changed, "
+              f"{len(delta['removed'])} rows replaced or removed")
+
+    return df, keys, {'removed': concat_frames(removed), 'added': concat_frames(added)}
+
+def merge_delta(df, keys, raw):
+    """
+    Merge one batch of raw rows into the preprocessed frame.
+
+    Changed companies keep their row position, new companies are appended and
+    companies whose new version no longer passes cleaning are removed.
+
+    Args:
+        df (pd.DataFrame): Preprocessed frame
+        keys (pd.DataFrame): Row keys of df
+        raw (pd.DataFrame): Raw rows as returned by read_investments_csv
+
+    Returns:
+        tuple: (df, keys, delta), see merge_updates
+    """
+    # The last row of a permalink wins, both in the batch and in the store
+    raw_keys = row_keys(raw).dropna(subset=[KEY_COLUMN]).drop_duplicates(KEY_COLUMN, keep='last')
+    current = keys.dropna(subset=[KEY_COLUMN]).drop_duplicates(KEY_COLUMN, keep='last')
+    current = current.reset_index().set_index(KEY_COLUMN)
+
+    known = raw_keys[KEY_COLUMN].isin(current.index).to_numpy()
+    old_hash = current['row_hash'].reindex(raw_keys.loc[known, KEY_COLUMN]).to_numpy()
+    changed = ~known
+    changed[known] = old_hash != raw_keys.loc[known, 'row_hash'].to_numpy()
+
+    raw_keys = raw_keys[changed]
+    known = known[changed]
+    empty_delta = {'removed': df.iloc[:0], 'added': df.iloc[:0]}
+    if raw_keys.empty:
+        return df, keys, empty_delta
+
+    # Clean and preprocess only the delta
+    delta = clean_data(raw.loc[raw_keys.index], verbose=False)
+    delta = preprocess_data(delta, verbose=False)
+
+    # Rows of the combined frame: the existing rows followed by the delta
+    combined = concat_frames([df, delta])
+    order = np.arange(len(df))
+    delta_rows = pd.Series(np.arange(len(df), len(combined)), index=delta.index)
+    new_rows = delta_rows.reindex(raw_keys.index, fill_value=-1).to_numpy()
+
+    old = current.reindex(raw_keys[KEY_COLUMN])
+    old_rows = old['frame_row'].fillna(-1).astype(np.int64).to_numpy()
+    key_rows = old['index'].fillna(-1).astype(np.int64).to_numpy()
+    in_frame = old_rows >= 0
+
+    # Changed companies are replaced in place, or marked for removal
+    order[old_rows[in_frame]] = new_rows[in_frame]
+    # New companies, and known ones that failed cleaning before, are appended
+    appended = new_rows[~in_frame]
+    order = np.concatenate([order[order >= 0], appended[appended >= 0]])
+
+    # Update the keys: overwrite known permalinks, append new ones
+    keys = keys.copy()
+    keys.loc[key_rows[known], 'row_hash'] = raw_keys.loc[known, 'row_hash'].to_numpy()
+    keys.loc[key_rows[known], 'frame_row'] = new_rows[known]
+    new_keys = raw_keys[~known].assign(frame_row=new_rows[~known])
+    keys = pd.concat([keys, new_keys], ignore_index=True)
+
+    # Translate rows of the combined frame to rows of the merged frame
+    positions = np.full(len(combined), -1, dtype=np.int64)
+    positions[order] = np.arange(len(order))
+    frame_rows = keys['frame_row'].to_numpy()
+    keys['frame_row'] = np.where(frame_rows >= 0, positions[np.maximum(frame_rows, 0)], -1)
+
+    replaced = old_rows[in_frame]
+    delta_info = {
+        'removed': df.iloc[replaced],
+        'added': combined.iloc[new_rows[new_rows >= 0]].reset_index(drop=True),
+    }
+
+    df = combined.iloc[order].reset_index(drop=True)
+    return df, keys, delta_info
+
+def concat_frames(frames):
+    """
+    Concatenate preprocessed frames, keeping categorical columns categorical.
+
+    pandas falls back to object dtype when categoricals with different
+    categories are concatenated, so the categories are unified first.
+
+    Args:
+        frames (list): Preprocessed dataframes
+
+    Returns:
+        pd.DataFrame: Concatenated dataframe with a fresh RangeIndex
+    """
+    frames = [frame for frame in frames if frame is not None]
+    for col in CATEGORICAL_COLS:
+        if all(col in frame.columns and isinstance(frame[col].dtype, pd.CategoricalDtype) for frame in frames):
+            categories = pd.api.types.union_categoricals([frame[col] for frame in frames]).categories
+            frames = [frame.assign(**{col: frame[col].cat.set_categories(categories)}) for frame in frames]
+
+    return pd.concat(frames, ignore_index=True)
+
+def read_investments_csv(data_file, chunksize=None, engine=None):
+    """
+    Read the raw investments CSV, typing every column with INVESTMENTS_SCHEMA.
+
+    Args:
+        data_file (str): Path to the CSV file
+        chunksize (int, optional): Read the file in chunks of this many rows
+        engine (str, optional): CSV parser, 'pyarrow' or 'c'. Defaults to
+            pyarrow when it is installed and the file is read in one go.
+
+    Returns:
+        pd.DataFrame or iterator: Raw dataframe, or an iterator of raw chunks
+            if chunksize is given
+    """
+    # The header has padded names like ' market ', so map them to the schema first
+    raw_columns = pd.read_csv(data_file, nrows=0).columns
+    read_options = {
+        'dtype': _schema_parse_dtypes(raw_columns),
+        'na_values': NA_TOKENS,
+    }
+
+    if chunksize:
+        return (
+            apply_schema(_strip_column_names(chunk))
+            for chunk in pd.read_csv(data_file, chunksize=chunksize,
+                                     thousands=THOUSANDS_SEPARATOR, **read_options)
+        )
+
+    if engine is None:
+        engine = 'pyarrow' if cache_available() else 'c'
+
+    if engine == 'pyarrow':
+        try:
+            df = pd.read_csv(data_file, engine='pyarrow', **read_options)
+            return apply_schema(_strip_column_names(df))
+        except ValueError as e:
+            # The pyarrow reader has no thousands separator support
+            print(f"pyarrow CSV reader failed ({e}), falling back to the C reader")
+
+    df = pd.read_csv(data_file, thousands=THOUSANDS_SEPARATOR, **read_options)
+    return apply_schema(_strip_column_names(df))
+
+def _schema_parse_dtypes(raw_columns):
+    # Numbers are parsed by the reader itself; everything else is read as text
+    # and converted afterwards by apply_schema
+    dtypes = {}
+    for raw in raw_columns:
+        kind = INVESTMENTS_SCHEMA.get(raw.strip())
+        if kind is not None:
+            dtypes[raw] = 'float64' if kind == 'float64' else object
+    return dtypes
+
+def _strip_column_names(df):
+    df.columns = df.columns.str.strip()
+    return df
+
+def apply_schema(df):
+    """
+    Convert columns to the types declared in INVESTMENTS_SCHEMA.
+
+    Columns that already have their target type are left untouched, so calling
+    this on an already typed frame costs nothing.
+
+    Args:
+        df (pd.DataFrame): Dataframe with stripped column names
+
+    Returns:
+        pd.DataFrame: Dataframe with typed columns
+    """
+    for col, kind in INVESTMENTS_SCHEMA.items():
+        if col not in df.columns:
+            continue
+
+        if isinstance(kind, tuple):
+            if not pd.api.types.is_datetime64_any_dtype(df[col]):
+                df[col] = pd.to_datetime(df[col], format=kind[1], errors='coerce')
+        elif kind == 'money':
+            if not pd.api.types.is_numeric_dtype(df[col]):
+                df[col] = pd.to_numeric(
+                    df[col].str.replace(THOUSANDS_SEPARATOR, '', regex=False).str.strip(),
+                    errors='coerce'
+                )
+        elif kind == 'float64':
+            if not pd.api.types.is_numeric_dtype(df[col]):
+                df[col] = pd.to_numeric(df[col], errors='coerce')
 
     return df
 
-def clean_data(df_uncleaned):
-    print("Investments shape is: ", df_uncleaned.shape)
-    print(df_uncleaned.head(5))
-    print(df_uncleaned.info())
+def restore_cached_columns(df):
+    """
+    Re-derive the columns whose cached values may be out of date.
+
+    `company_age_years` depends on today's date, so it is recomputed after loading.
+
+    Args:
+        df (pd.DataFrame): Frame read from the cache
+
+    Returns:
+        pd.DataFrame: Frame with the derived columns restored
+    """
+    if 'founded_at' in df.columns:
+        df['company_age_years'] = compute_company_age(df['founded_at'])
+
+    return df
+
+def compute_company_age(founded_at):
+    """
+    Compute company age in years from the founding date.
+
+    Args:
+        founded_at (pd.Series): Founding dates
+
+    Returns:
+        pd.Series: Company age in years
+    """
+    return (datetime.now() - founded_at).dt.days / 365.25
+
+def clean_data(df_uncleaned, verbose=True):
+    """
+    Clean the raw investments dataframe.
+
+    Args:
+        df_uncleaned (pd.DataFrame): Raw dataframe as read from the CSV
+        verbose (bool): Print the data profiling report. Streaming ingestion
+            turns this off so the report is not repeated for every chunk.
+
+    Returns:
+        pd.DataFrame: Cleaned dataframe
+    """
+    if verbose:
+        print("Investments shape is: ", df_uncleaned.shape)
+        print(df_uncleaned.head(5))
+        print(df_uncleaned.info())
 
-    duplicates_count = df_uncleaned['permalink'].duplicated(keep=False).sum()
-    print(f"Number of duplicated entries in 'permalink' column: {duplicates_count}")
+        duplicates_count = df_uncleaned['permalink'].duplicated(keep=False).sum()
+        print(f"Number of duplicated entries in 'permalink' column: {duplicates_count}")
 
 
-    status_counts = df_uncleaned['status'].value_counts(dropna=False)
+        status_counts = df_uncleaned['status'].value_counts(dropna=False)
 
-    check = len(df_uncleaned) - status_counts.get('acquired', 0) - status_counts.get('closed', 0) - status_counts.get('operating', 0)
+        check = len(df_uncleaned) - status_counts.get('acquired', 0) - status_counts.get('closed', 0) - status_counts.get('operating', 0)
 
-    missing_values = df_uncleaned["status"].isna().sum()
+        missing_values = df_uncleaned["status"].isna().sum()
 
-    other = check - missing_values
+        other = check - missing_values
 
-    print(f"There are {status_counts.get('acquired', 0)} acquired companies")
-    print(f"There are {status_counts.get('closed', 0)} closed companies")
-    print(f"There are {status_counts.get('operating', 0)} operating companies")
-    print(f"There are {missing_values} NaN values")
-    print(f"There are {other} other values")
+        print(f"There are {status_counts.get('acquired', 0)} acquired companies")
+        print(f"There are {status_counts.get('closed', 0)} closed companies")
+        print(f"There are {status_counts.get('operating', 0)} operating companies")
+        print(f"There are {missing_values} NaN values")
+        print(f"There are {other} other values")
 
     # Data Cleaning
     # Remove duplicates
@@ -90,40 +711,31 @@ def clean_data(df_uncleaned):
     # Ensure column names are trimmed
     df_clean.columns = df_clean.columns.str.strip()
 
-    # Directly convert 'funding_total_usd' to a float, thereby also transforming "-" to NaN
-    df_clean['funding_total_usd'] = pd.to_numeric(df_clean['funding_total_usd'].str.replace(',', ''), errors='coerce')
-
-    df_clean["funding_total_usd"].dtype
-
-
-
     # Since some column names have the wrong format, we fix it
     df_clean.rename(columns={' market ': 'market', ' funding_total_usd ': 'funding_total_usd'}, inplace=True)
 
-    # Turning all of our Date Columns into pd.datetime, to ensure consistency and the right data type 
-    df_clean['founded_at'] =  pd.to_datetime(df_clean['founded_at'], format='%Y-%m-%d', errors = 'coerce')
-    df_clean['first_funding_at'] =  pd.to_datetime(df_clean['first_funding_at'], format='%Y-%m-%d', errors = 'coerce')
-    df_clean['last_funding_at'] =  pd.to_datetime(df_clean['last_funding_at'], format='%Y-%m-%d', errors = 'coerce')
-    df_clean['founded_year'] =  pd.to_datetime(df_clean['founded_year'], format='%Y', errors = 'coerce')
-    df_clean['founded_month'] =  pd.to_datetime(df_clean['founded_month'], format='%Y-%m', errors = 'coerce')
+    # Type the numeric and date columns (a no-op for frames read with
+    # read_investments_csv, which already applied the schema at parse time)
+    df_clean = apply_schema(df_clean)
 
     # Cleaning the Market column, since it has unnecessary spaces
     df_clean['market'] = df_clean['market'].str.strip()
 
-    # Calculate the number of missing values for each column in df_clean
-    missing_counts = df_clean.isnull().sum()
+    if verbose:
+        # Calculate the number of missing values for each column in df_clean
+        missing_counts = df_clean.isnull().sum()
 
-    # Calculate the percentage of missing values for each column
-    missing_percentage = (missing_counts / len(df_clean)) * 100
+        # Calculate the percentage of missing values for each column
+        missing_percentage = (missing_counts / len(df_clean)) * 100
 
-    # Create a DataFrame to analyze missing data
-    missing_data = pd.DataFrame({
-        'Column': df_clean.columns,
-        'Missing Values': missing_counts,
-        'Percentage Missing (%)': missing_percentage
-    }).sort_values(by='Percentage Missing (%)', ascending=False)
+        # Create a DataFrame to analyze missing data
+        missing_data = pd.DataFrame({
+            'Column': df_clean.columns,
+            'Missing Values': missing_counts,
+            'Percentage Missing (%)': missing_percentage
+        }).sort_values(by='Percentage Missing (%)', ascending=False)
 
-    print(missing_data)
+        print(missing_data)
     '''
     plt.figure(figsize=(15, 8))
     sns.barplot(x='Percentage Missing (%)', y='Column', data=missing_data)
@@ -133,18 +745,9 @@ def clean_data(df_uncleaned):
     plt.show()
     '''
 
-    df_clean["founded_year"].dtypes
-    df_clean["founded_year"].isna().sum()
-
-
-    if not pd.api.types.is_datetime64_any_dtype(df_clean['founded_year']):
-        df_clean['founded_year'] = pd.to_datetime(df_clean['founded_year'], errors='coerce', format='%Y')
-
-    # Check if there are any non-conversible values that caused 'coerce' to produce NaT
-    print("After conversion, null values:", df_clean['founded_year'].isnull().sum())
-
-    #Convert datetime to integer year
-    df_clean['founded_year'] = df_clean['founded_year'].dt.year
+    # Check if there are any non-conversible values that caused 'coerce' to produce NaN
+    if verbose:
+        print("After conversion, null values:", df_clean['founded_year'].isnull().sum())
 
     '''
     Comment out the next line if you want to see the distribution of the founded_year column
@@ -161,7 +764,8 @@ def clean_data(df_uncleaned):
     # Since status is part of our target variable, has a lot of important information and cannot be properly imputed, we will drop all NaN´s in this column
     df_clean = df_clean.dropna(subset=["status"])
 
-    print("Number of NaN: ", df_clean["status"].isna().sum())
+    if verbose:
+        print("Number of NaN: ", df_clean["status"].isna().sum())
 
     df_clean[['convertible_note', 'angel', 'grant', 'private_equity',
         'secondary_market', 'product_crowdfunding', 'round_A','round_B',
@@ -170,12 +774,13 @@ def clean_data(df_uncleaned):
     
     return df_clean
 
-def preprocess_data(df):
+def preprocess_data(df, verbose=True):
     """
     Preprocess the dataframe for analysis.
     
     Args:
         df (pd.DataFrame): Raw dataframe
+        verbose (bool): Print how much memory the compact dtypes saved
         
     Returns:
         pd.DataFrame: Preprocessed dataframe
@@ -187,13 +792,13 @@ def preprocess_data(df):
                    'round_F', 'round_G', 'round_H']
     
     for col in numeric_cols:
-        if col in df.columns:
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
             df[col] = pd.to_numeric(df[col], errors='coerce')
     
     # Convert date columns to datetime
     date_cols = ['founded_at', 'first_funding_at', 'last_funding_at']
     for col in date_cols:
-        if col in df.columns:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
             df[col] = pd.to_datetime(df[col], errors='coerce')
             
     # Extract year from founded_at if founded_year is not available
@@ -214,19 +819,17 @@ def preprocess_data(df):
         
     # Calculate company age (years since founding)
     if 'founded_at' in df.columns:
-        df['company_age_years'] = (datetime.now() - df['founded_at']).dt.days / 365.25
+        df['company_age_years'] = compute_company_age(df['founded_at'])
     
     # Process category_list to create individual categories
     if 'category_list' in df.columns:
         # Remove leading/trailing pipes and spaces
         df['category_list'] = df['category_list'].str.strip('|').str.strip()
-        df['categories'] = df['category_list'].str.split('|')
-        df['category_count'] = df['categories'].apply(lambda x: len(x) if isinstance(x, list) else 0)
+        categories = CategoryTable.from_category_list(df['category_list'])
+        df['category_count'] = categories.counts()
         
         # Extract main category (first in the list)
-        df['main_category'] = df['categories'].apply(
-            lambda x: x[0].strip() if isinstance(x, list) and len(x) > 0 else 'Unknown'
-        )
+        df['main_category'] = categories.main_categories()
     
     # Fill missing values in categorical columns
     categorical_cols = ['country_code', 'state_code', 'city', 'region', 'market', 'status']
@@ -237,7 +840,63 @@ def preprocess_data(df):
     # Filter for India
     #df = df[df['country_code'].str.upper() == 'IND']
     
+    df = compact_dtypes(df, verbose=verbose)
+
+    return df
+
+def compact_dtypes(df, verbose=True):
+    """
+    Convert the preprocessed frame to a compact in-memory representation.
+
+    Low-cardinality text columns become categoricals, the funding round columns
+    become float32 and years and counts become small nullable integers.
+
+    Args:
+        df (pd.DataFrame): Preprocessed dataframe
+        verbose (bool): Print the memory saved
+
+    Returns:
+        pd.DataFrame: Dataframe with compact dtypes
+    """
+    before = df.memory_usage(deep=True).sum() if verbose else 0
+
+    for col in CATEGORICAL_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
+    for col in ROUND_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype('float32')
+
+    for col, dtype in SMALL_INT_COLS.items():
+        if col in df.columns and pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].round().astype(dtype)
+
+    if verbose:
+        after = df.memory_usage(deep=True).sum()
+        print(f"Compact dtypes reduced memory from {before / 1e6:.1f} MB to {after / 1e6:.1f} MB "
+              f"({1 - after / before:.0%} saved)")
+
+    return df
+
+def drop_unused_categories(df):
+    """
+    Remove categories that no longer occur after filtering.
+
+    Keeps value_counts and plots of a filtered slice limited to the values
+    actually present in it.
+
+    Args:
+        df (pd.DataFrame): Filtered dataframe
 
+    Returns:
+        pd.DataFrame: Dataframe with unused categories removed
+    """
+    # A shallow copy lets the new columns be set without touching the
+    # (possibly shared) frame the slice was taken from
+    df = df.copy(deep=False)
+    for col in df.select_dtypes(include='category').columns:
+        df[col] = df[col].cat.remove_unused_categories()
     return df
 
 def create_sample_data():
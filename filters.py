@@ -0,0 +1,215 @@
+import numpy as np
+import pandas as pd
+
+# Country the dashboard pages are scoped to
+HOME_COUNTRY = 'IND'
+
+# Columns the sidebar filters on, by kind of filter
+RANGE_FILTER_COLS = ['founded_year', 'funding_total_usd']
+CATEGORICAL_FILTER_COLS = ['market', 'status', 'region', 'country_code']
+
+
+class FilterIndex:
+    """
+    Precomputed index answering the sidebar filters without scanning rows.
+
+    Range columns are stored as their non-missing row positions sorted by
+    value, so a range is two searchsorted calls. Categorical columns are stored
+    as one position list per category in CSR form (positions grouped by
+    category code plus offsets). Every filter yields a boolean row bitmap and
+    filters are combined by intersecting bitmaps.
+
+    Rows are positions in the loaded dataset, which has a RangeIndex.
+    """
+
+    def __init__(self, df, range_cols=RANGE_FILTER_COLS, categorical_cols=CATEGORICAL_FILTER_COLS):
+        self.n_rows = len(df)
+        self.sorted_values = {}
+        self.sorted_rows = {}
+        self.category_offsets = {}
+        self.category_rows = {}
+        self.categories = {}
+
+        for col in range_cols:
+            if col not in df.columns:
+                continue
+            values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            rows = np.flatnonzero(~np.isnan(values))
+            order = np.argsort(values[rows], kind='stable')
+            self.sorted_rows[col] = rows[order]
+            self.sorted_values[col] = values[rows][order]
+
+        for col in categorical_cols:
+            if col not in df.columns:
+                continue
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                codes, categories = df[col].cat.codes.to_numpy(), df[col].cat.categories
+            else:
+                codes, categories = pd.factorize(df[col])
+            # Missing values get code -1 and are left out of every list
+            rows = np.flatnonzero(codes >= 0)
+            order = np.argsort(codes[rows], kind='stable')
+            offsets = np.zeros(len(categories) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(codes[rows], minlength=len(categories)), out=offsets[1:])
+            self.category_rows[col] = rows[order]
+            self.category_offsets[col] = offsets
+            self.categories[col] = pd.Index(categories)
+
+    def range_mask(self, col, low, high):
+        """
+        Bitmap of the rows with low <= value <= high.
+
+        Args:
+            col (str): Range column
+            low (float): Lower bound, inclusive
+            high (float): Upper bound, inclusive
+
+        Returns:
+            np.ndarray: Boolean mask over all rows
+        """
+        values = self.sorted_values[col]
+        start = np.searchsorted(values, low, side='left')
+        stop = np.searchsorted(values, high, side='right')
+
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self.sorted_rows[col][start:stop]] = True
+        return mask
+
+    def isin_mask(self, col, values):
+        """
+        Bitmap of the rows whose value is one of `values`.
+
+        Args:
+            col (str): Categorical column
+            values (list): Accepted values
+
+        Returns:
+            np.ndarray: Boolean mask over all rows
+        """
+        codes = self.categories[col].get_indexer(values)
+        offsets = self.category_offsets[col]
+
+        mask = np.zeros(self.n_rows, dtype=bool)
+        for code in codes[codes >= 0]:
+            mask[self.category_rows[col][offsets[code]:offsets[code + 1]]] = True
+        return mask
+
+    def select(self, ranges=None, isin=None):
+        """
+        Row positions matching all the given filters.
+
+        Args:
+            ranges (dict, optional): Column -> (low, high) inclusive bounds
+            isin (dict, optional): Column -> list of accepted values
+
+        Returns:
+            np.ndarray: Sorted row positions
+        """
+        mask = np.ones(self.n_rows, dtype=bool)
+
+        for col, (low, high) in (ranges or {}).items():
+            mask &= self.range_mask(col, low, high)
+
+        for col, values in (isin or {}).items():
+            mask &= self.isin_mask(col, values)
+
+        return np.flatnonzero(mask)
+
+
+def filter_mask(df, ranges=None, isin=None):
+    """
+    Rows of a frame matching a filter state, by scanning its columns.
+
+    Used for frames the FilterIndex was not built for, such as partitions read
+    from disk. Missing values never match, as with FilterIndex.select.
+
+    Args:
+        df (pd.DataFrame): Frame holding the filtered columns
+        ranges (dict, optional): Column -> (low, high) inclusive bounds
+        isin (dict, optional): Column -> list of accepted values
+
+    Returns:
+        np.ndarray: Boolean mask over the rows of df
+    """
+    mask = np.ones(len(df), dtype=bool)
+
+    for col, (low, high) in (ranges or {}).items():
+        values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        mask &= (values >= low) & (values <= high)
+
+    for col, values in (isin or {}).items():
+        mask &= df[col].isin(values).to_numpy(dtype=bool)
+
+    return mask
+
+
+def filter_key(ranges=None, isin=None):
+    """
+    Canonical, hashable key of a filter state.
+
+    Bounds are normalized to floats and accepted values are sorted, so the
+    same filters always give the same key regardless of selection order.
+
+    Args:
+        ranges (dict, optional): Column -> (low, high) inclusive bounds
+        isin (dict, optional): Column -> list of accepted values
+
+    Returns:
+        tuple: Key usable in a dict or cache
+    """
+    range_key = tuple(sorted(
+        (col, float(low), float(high)) for col, (low, high) in (ranges or {}).items()
+    ))
+    isin_key = tuple(sorted(
+        (col, tuple(sorted(set(map(str, values))))) for col, values in (isin or {}).items()
+    ))
+    return range_key, isin_key
+
+
+def _top_values(series, n):
+    # Categorical value_counts also lists categories that do not occur
+    counts = series.value_counts()
+    return counts[counts > 0].nlargest(n).index.tolist()
+
+
+def build_filter_catalogue(df, home_country=HOME_COUNTRY):
+    """
+    Precompute everything the sidebar needs to render its filter widgets.
+
+    Entries are None when the dataset has no usable values for that filter.
+
+    Args:
+        df (pd.DataFrame): Full preprocessed dataset
+        home_country (str): Country code the funding slider and regions are scoped to
+
+    Returns:
+        dict: 'year_range' and 'funding_range' as (min, max), 'top_markets'
+            (20 most common overall), 'statuses' (distinct, in order of
+            appearance) and 'top_regions' (10 most common in the home country)
+    """
+    catalogue = {
+        'year_range': None,
+        'funding_range': None,
+        'top_markets': None,
+        'statuses': None,
+        'top_regions': None,
+    }
+    home = df[df['country_code'] == home_country] if 'country_code' in df.columns else df.iloc[:0]
+
+    if 'founded_year' in df.columns and df['founded_year'].notna().any():
+        catalogue['year_range'] = (int(df['founded_year'].min()), int(df['founded_year'].max()))
+
+    if 'funding_total_usd' in df.columns and df['funding_total_usd'].notna().any():
+        catalogue['funding_range'] = (float(home['funding_total_usd'].min()), float(home['funding_total_usd'].max()))
+
+    if 'market' in df.columns and df['market'].notna().any():
+        catalogue['top_markets'] = _top_values(df['market'], 20)
+
+    if 'status' in df.columns and df['status'].notna().any():
+        catalogue['statuses'] = df['status'].unique().tolist()
+
+    if 'region' in df.columns and df['region'].notna().any():
+        regions = home['region'][home['region'] != 'Unknown']
+        catalogue['top_regions'] = _top_values(regions, 10)
+
+    return catalogue
@@ -0,0 +1,248 @@
+import argparse
+import json
+import os
+from collections import defaultdict
+
+import numpy as np
+
+# Simplified map geometry shipped with the app, one GeoJSON file per shape set
+# and level of detail: assets/geo/<name>.<level>.geojson
+GEO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets', 'geo')
+
+# Levels of detail, finest first: (level, simplification tolerance in degrees,
+# decimal places kept in coordinates)
+DETAIL_LEVELS = [
+    ('high', 0.005, 4),
+    ('medium', 0.02, 3),
+    ('low', 0.1, 2),
+]
+
+
+def geometry_path(name, level):
+    return os.path.join(GEO_DIR, f"{name}.{level}.geojson")
+
+
+def map_detail(extent, width):
+    """
+    Pick the coarsest level of detail that still draws at full resolution.
+
+    A level is fine enough when its simplification tolerance is below the
+    extent of one pixel, so the simplification is invisible.
+
+    Args:
+        extent (float): Longitude span of the map in degrees
+        width (int): Width the map is rendered at in pixels
+
+    Returns:
+        str: Level from DETAIL_LEVELS
+    """
+    degrees_per_pixel = extent / max(width, 1)
+    level = DETAIL_LEVELS[0][0]
+    for name, tolerance, _ in DETAIL_LEVELS:
+        if tolerance <= degrees_per_pixel:
+            level = name
+    return level
+
+
+def read_geometry(name, level):
+    """
+    Read a bundled shape set, falling back to the nearest level available.
+
+    Args:
+        name (str): Shape set, e.g. 'india_states'
+        level (str): Level from DETAIL_LEVELS
+
+    Returns:
+        dict or None: GeoJSON FeatureCollection whose features carry their
+            key as 'id', or None when the shape set is not bundled
+    """
+    levels = [lvl for lvl, _, _ in DETAIL_LEVELS]
+    position = levels.index(level)
+    # Prefer the requested level, then finer ones, then coarser ones
+    for candidate in levels[position::-1] + levels[position + 1:]:
+        path = geometry_path(name, candidate)
+        if os.path.exists(path):
+            with open(path) as f:
+                return json.load(f)
+    return None
+
+
+def subset_features(geojson, ids):
+    """
+    Keep the features of the locations a chart colors.
+
+    Plotly only draws features with a value, so the others are dead weight
+    in the figure sent to the browser.
+
+    Args:
+        geojson (dict): FeatureCollection with feature ids
+        ids (iterable): Location ids of the chart
+
+    Returns:
+        dict: FeatureCollection of the matching features
+    """
+    ids = set(ids)
+    return {
+        'type': 'FeatureCollection',
+        'features': [feature for feature in geojson['features'] if feature.get('id') in ids],
+    }
+
+
+def _douglas_peucker(points, tolerance):
+    # Iterative Douglas-Peucker keeping the first and last point
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        inner = points[start + 1:end]
+        segment = points[end] - points[start]
+        offset = inner - points[start]
+        length = np.hypot(*segment)
+        if length > 0:
+            distance = np.abs(segment[0] * offset[:, 1] - segment[1] * offset[:, 0]) / length
+        else:
+            # Closed chunk: measure the distance to its end point
+            distance = np.hypot(offset[:, 0], offset[:, 1])
+        farthest = int(np.argmax(distance))
+        if distance[farthest] > tolerance:
+            split = start + 1 + farthest
+            keep[split] = True
+            stack += [(start, split), (split, end)]
+    return points[keep]
+
+
+def _junctions(rings):
+    # Vertices where borders meet or end: more than two distinct neighbours
+    # over all the rings, plus the start of every ring
+    neighbours = defaultdict(set)
+    starts = set()
+    for ring in rings:
+        points = [tuple(point) for point in ring[:-1]]
+        starts.add(points[0])
+        for i, point in enumerate(points):
+            neighbours[point].update((points[i - 1], points[(i + 1) % len(points)]))
+    return starts | {point for point, near in neighbours.items() if len(near) != 2}
+
+
+def _simplify_ring(ring, fixed, tolerance):
+    # Split the ring at fixed vertices and simplify every arc on its own. An
+    # arc shared by two polygons is simplified from the same end in both, so
+    # neighbouring shapes keep a common border without gaps or overlaps
+    points = np.asarray(ring, dtype=np.float64)
+    cuts = [i for i, point in enumerate(map(tuple, points[:-1])) if point in fixed] + [len(points) - 1]
+    simplified = [points[:1]]
+    for start, end in zip(cuts, cuts[1:]):
+        arc = points[start:end + 1]
+        reverse = tuple(arc[-1]) < tuple(arc[0])
+        arc = _douglas_peucker(arc[::-1] if reverse else arc, tolerance)
+        simplified.append((arc[::-1] if reverse else arc)[1:])
+    return np.concatenate(simplified)
+
+
+def _quantize(ring, precision):
+    ring = np.round(ring, precision)
+    # Rounding can make neighbouring vertices coincide
+    distinct = np.r_[True, np.any(ring[1:] != ring[:-1], axis=1)]
+    return ring[distinct]
+
+
+def _orient(ring, clockwise):
+    # Plotly draws shapes with d3-geo, which takes a counter-clockwise
+    # exterior ring for its complement, i.e. the rest of the globe
+    x, y = ring[:, 0], ring[:, 1]
+    area = np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1])
+    return ring[::-1] if (area < 0) != clockwise else ring
+
+
+def _polygons(geometry):
+    if geometry['type'] == 'Polygon':
+        return [geometry['coordinates']]
+    if geometry['type'] == 'MultiPolygon':
+        return geometry['coordinates']
+    raise ValueError(f"Unsupported geometry type {geometry['type']!r}")
+
+
+def simplify_geojson(geojson, tolerance, precision, id_property):
+    """
+    Simplify the polygons of a FeatureCollection, preserving shared borders.
+
+    Args:
+        geojson (dict): FeatureCollection of Polygon and MultiPolygon features
+        tolerance (float): Douglas-Peucker tolerance in degrees
+        precision (int): Decimal places kept in coordinates
+        id_property (str): Property holding the key charts match locations on;
+            it becomes the feature id and the only property kept
+
+    Returns:
+        dict: Simplified FeatureCollection, with exterior rings clockwise and
+            holes counter-clockwise as Plotly expects
+    """
+    features = [feature for feature in geojson['features'] if feature.get('geometry')]
+    fixed = _junctions([ring for feature in features
+                        for polygon in _polygons(feature['geometry']) for ring in polygon])
+
+    simplified = []
+    for feature in features:
+        polygons = []
+        for polygon in _polygons(feature['geometry']):
+            rings = [_orient(_quantize(_simplify_ring(ring, fixed, tolerance), precision), clockwise=(i == 0))
+                     for i, ring in enumerate(polygon)]
+            # A closed ring needs at least three distinct points; collapsed
+            # islands and holes are dropped
+            if len(rings[0]) < 4:
+                continue
+            polygons.append([ring.tolist() for ring in rings if len(ring) >= 4])
+
+        if not polygons:
+            # Keep tiny shapes visible at their first polygon's full detail
+            polygons = [[_orient(_quantize(np.asarray(ring, dtype=np.float64), precision), clockwise=(i == 0)).tolist()
+                         for i, ring in enumerate(_polygons(feature['geometry'])[0])]]
+
+        key = feature['properties'][id_property]
+        simplified.append({
+            'type': 'Feature',
+            'id': key,
+            'properties': {id_property: key},
+            'geometry': {'type': 'MultiPolygon', 'coordinates': polygons},
+        })
+
+    return {'type': 'FeatureCollection', 'features': simplified}
+
+
+def build_assets(source, name, id_property):
+    """
+    Write every level of detail of a shape set to GEO_DIR.
+
+    Args:
+        source (str): Path of the full-resolution GeoJSON
+        name (str): Name of the shape set
+        id_property (str): Property holding the location key
+
+    Returns:
+        dict: Level -> size of the written file in bytes
+    """
+    with open(source) as f:
+        geojson = json.load(f)
+
+    os.makedirs(GEO_DIR, exist_ok=True)
+    sizes = {}
+    for level, tolerance, precision in DETAIL_LEVELS:
+        path = geometry_path(name, level)
+        with open(path, 'w') as f:
+            json.dump(simplify_geojson(geojson, tolerance, precision, id_property), f, separators=(',', ':'))
+        sizes[level] = os.path.getsize(path)
+    return sizes
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build the simplified map geometry bundled with the app.")
+    parser.add_argument('source', help="full-resolution GeoJSON file")
+    parser.add_argument('name', help="shape set name, e.g. india_states or world_countries")
+    parser.add_argument('id_property', help="feature property charts match locations on, e.g. ST_NM or ISO_A3")
+    args = parser.parse_args()
+
+    for level, size in build_assets(args.source, args.name, args.id_property).items():
+        print(f"{geometry_path(args.name, level)}: {size / 1024:.0f} KB")
@@ -0,0 +1,75 @@
+import pandas as pd
+
+from filters import filter_mask
+
+# pyarrow reads the partitions written by data_cache.save_cached_partitions
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+def group_statistics(df, keys, measure='funding_total_usd'):
+    """
+    Count rows and total a measure per combination of key columns.
+
+    Args:
+        df (pd.DataFrame): Rows to aggregate
+        keys (list): Columns to group by; missing key values form their own group
+        measure (str): Numeric column to total
+
+    Returns:
+        pd.DataFrame: The key columns, 'size' (rows), 'count' (non-missing
+            measure values) and 'sum' per group
+    """
+    grouped = df.groupby(keys, observed=True, dropna=False)[measure]
+    stats = pd.DataFrame({
+        'size': grouped.size(),
+        'count': grouped.count(),
+        'sum': grouped.sum(),
+    })
+    return stats.reset_index()
+
+
+def partitioned_statistics(partitions, column, by, measure='funding_total_usd', ranges=None, isin=None):
+    """
+    Aggregate a partitioned dataset one partition at a time.
+
+    Only the columns the filters and statistics need are read, and only one
+    partition's rows are held in memory at a time. Partitions excluded by a
+    filter on the partition column are not read at all.
+
+    Args:
+        partitions (dict): Directory of each partition, by value of `column`
+        column (str): Column the dataset is partitioned by
+        by (str): Column to break the statistics of each partition down by
+        measure (str): Numeric column to total
+        ranges (dict, optional): Column -> (low, high) inclusive bounds
+        isin (dict, optional): Column -> list of accepted values
+
+    Returns:
+        pd.DataFrame: `column`, `by`, 'size', 'count' and 'sum' per group,
+            see group_statistics
+    """
+    isin = dict(isin or {})
+    accepted = isin.pop(column, None)
+    if accepted is not None:
+        accepted = set(map(str, accepted))
+    columns = list(dict.fromkeys([by, measure, *(ranges or {}), *isin]))
+
+    tables = []
+    for value, path in partitions.items():
+        if accepted is not None and value not in accepted:
+            continue
+
+        part = pq.read_table(path, columns=columns).to_pandas()
+        part = part[filter_mask(part, ranges, isin)]
+        if len(part):
+            tables.append(group_statistics(part, [by], measure).assign(**{column: value}))
+
+    if not tables:
+        return pd.DataFrame({column: [], by: [], 'size': [], 'count': [], 'sum': []})
+
+    # Categories differ between partitions, so the groups keep plain values
+    stats = pd.concat([table.astype({by: object}) for table in tables], ignore_index=True)
+    return stats[[column, by, 'size', 'count', 'sum']]
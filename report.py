@@ -0,0 +1,238 @@
+import argparse
+import html
+import importlib.util
+import json
+import os
+import re
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+# Pages and data are loaded relative to the app directory
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Pages without charts are left out of reports
+REPORT_EXCLUDED_PAGES = ['About Us']
+
+# File of the plotly.js bundle written next to the reports, so they open offline
+PLOTLY_JS_FILE = 'plotly.min.js'
+
+# Preset used when no presets file is given: the dashboard without filters
+DEFAULT_PRESETS = {'all': {'ranges': {}, 'isin': {}}}
+
+
+def load_presets(path):
+    """
+    Read the filter presets reports are rendered for.
+
+    The file maps a preset name to its filters, in the units of the sidebar
+    widgets:
+
+        {"fintech-2000s": {"ranges": {"founded_year": [2000, 2009]},
+                           "isin": {"market": ["FinTech"]}}}
+
+    Args:
+        path (str, optional): JSON presets file; None for DEFAULT_PRESETS
+
+    Returns:
+        dict: Preset name -> {'ranges': {col: (low, high)}, 'isin': {col: [values]}}
+    """
+    if path is None:
+        return DEFAULT_PRESETS
+
+    with open(path) as f:
+        presets = json.load(f)
+
+    return {
+        name: {
+            'ranges': {col: tuple(bounds) for col, bounds in preset.get('ranges', {}).items()},
+            'isin': {col: list(values) for col, values in preset.get('isin', {}).items()},
+        }
+        for name, preset in presets.items()
+    }
+
+
+def slugify(text):
+    return re.sub(r'[^a-z0-9]+', '-', str(text).lower()).strip('-') or 'chart'
+
+
+def _init_worker():
+    # Workers import the app from its directory, like `streamlit run app.py`,
+    # without a Streamlit runtime, whose absence every element call warns about
+    import streamlit.logger
+    streamlit.logger.set_log_level('error')
+    os.chdir(APP_DIR)
+
+
+def render_page(preset, filters, page, png=False):
+    """
+    Run a dashboard page headlessly and render the charts it shows.
+
+    Runs in a worker process: the dataset, filter index and other
+    st.cache_resource singletons are loaded once per worker and reused by
+    every page it renders.
+
+    Args:
+        preset (str): Name of the filter preset
+        filters (dict): The preset's 'ranges' and 'isin'
+        page (str): Page name from app.PAGES
+        png (bool): Also render each chart as a PNG image
+
+    Returns:
+        dict: The preset, page, seconds taken, and one {'name', 'html', 'png'}
+            entry per chart
+
+    Raises:
+        RuntimeError: If the page rendered no charts
+    """
+    from app import PAGES, WORLDWIDE_PAGES
+    from data_processor import get_filtered_slice, get_country_statistics
+    from filters import HOME_COUNTRY
+    from utils import capture_charts
+
+    start = time.perf_counter()
+    ranges, isin = filters['ranges'], filters['isin']
+    df_filtered = get_filtered_slice(ranges, {**isin, 'country_code': [HOME_COUNTRY]})
+
+    with capture_charts() as charts:
+        if page in WORLDWIDE_PAGES:
+            PAGES[page](df_filtered, get_country_statistics(ranges, isin))
+        else:
+            PAGES[page](df_filtered)
+    if not charts:
+        raise RuntimeError(f"Page {page!r} rendered no charts for preset {preset!r}")
+
+    rendered = [{
+        'name': name,
+        'html': fig.to_html(full_html=False, include_plotlyjs=False, default_width='100%'),
+        'png': fig.to_image(format='png', width=1200, height=700) if png else None,
+    } for name, fig in charts]
+
+    return {'preset': preset, 'page': page, 'seconds': time.perf_counter() - start, 'charts': rendered}
+
+
+def write_report(out_dir, preset, filters, pages):
+    """
+    Write the HTML report of one preset, and the PNG images of its charts.
+
+    Args:
+        out_dir (str): Output directory
+        preset (str): Name of the filter preset
+        filters (dict): The preset's 'ranges' and 'isin', listed in the report
+        pages (list): Results of render_page for the preset, in page order;
+            pages that failed carry the 'error' instead of their charts
+
+    Returns:
+        str: Path of the HTML report
+    """
+    sections = []
+    for result in pages:
+        if result.get('error'):
+            sections.append(f"<h2>{html.escape(result['page'])}</h2>\n"
+                            f"<p><strong>This page could not be rendered:</strong></p>\n"
+                            f"<pre>{html.escape(result['error'])}</pre>")
+            continue
+
+        charts = []
+        for i, chart in enumerate(result['charts'], start=1):
+            charts.append(chart['html'])
+            if chart['png'] is not None:
+                image_dir = os.path.join(out_dir, slugify(preset))
+                os.makedirs(image_dir, exist_ok=True)
+                image = os.path.join(image_dir, f"{slugify(result['page'])}-{i:02d}-{slugify(chart['name'])}.png")
+                with open(image, 'wb') as f:
+                    f.write(chart['png'])
+        sections.append(f"<h2>{html.escape(result['page'])}</h2>\n" + '\n'.join(charts))
+
+    path = os.path.join(out_dir, f"{slugify(preset)}.html")
+    with open(path, 'w') as f:
+        f.write(f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Startup Analysis Report: {html.escape(preset)}</title>
+<script src="{PLOTLY_JS_FILE}"></script>
+</head>
+<body>
+<h1>Startup Analysis Report: {html.escape(preset)}</h1>
+<p>Filters: <code>{html.escape(json.dumps(filters))}</code></p>
+{''.join(sections)}
+</body>
+</html>
+""")
+    return path
+
+
+def render_reports(presets, out_dir, pages=None, png=False, workers=None):
+    """
+    Render the report of every preset, one page per task across a process pool.
+
+    Args:
+        presets (dict): Preset name -> filters, see load_presets
+        out_dir (str): Output directory
+        pages (list, optional): Pages to include; defaults to every page with charts
+        png (bool): Also write a PNG image of every chart (needs kaleido)
+        workers (int, optional): Worker processes; defaults to the CPU count
+
+    Returns:
+        list: Paths of the HTML reports; pages that failed are listed with
+            their error in their preset's report
+    """
+    if png and importlib.util.find_spec('kaleido') is None:
+        raise RuntimeError("PNG images need the kaleido package: pip install kaleido")
+
+    import plotly.offline
+    from app import PAGES
+
+    pages = pages or [page for page in PAGES if page not in REPORT_EXCLUDED_PAGES]
+    unknown = [page for page in pages if page not in PAGES]
+    if unknown:
+        raise ValueError(f"Unknown pages {unknown}, expected some of {list(PAGES)}")
+
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, PLOTLY_JS_FILE), 'w') as f:
+        f.write(plotly.offline.get_plotlyjs())
+
+    # One task per preset and page; every worker keeps its caches warm for
+    # the tasks that follow
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {
+            (preset, page): pool.submit(render_page, preset, filters, page, png)
+            for preset, filters in presets.items() for page in pages
+        }
+        results = {}
+        for (preset, page), future in futures.items():
+            # A failing page is reported in its preset's report instead of
+            # discarding every other report of the batch
+            try:
+                results[(preset, page)] = future.result()
+            except Exception:
+                error = traceback.format_exc()
+                print(f"Page {page!r} of preset {preset!r} failed:\n{error}", file=sys.stderr)
+                results[(preset, page)] = {'preset': preset, 'page': page, 'error': error, 'charts': []}
+
+    return [
+        write_report(out_dir, preset, filters, [results[(preset, page)] for page in pages])
+        for preset, filters in presets.items()
+    ]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Render static HTML reports of the dashboard pages.")
+    parser.add_argument('--presets', help="JSON file of filter presets (default: one report without filters)")
+    parser.add_argument('--out', default='reports', help="output directory (default: reports)")
+    parser.add_argument('--page', action='append', dest='pages', help="page to include; repeat for several (default: all)")
+    parser.add_argument('--png', action='store_true', help="also write a PNG image of every chart (needs kaleido)")
+    parser.add_argument('--workers', type=int, help="worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    out_dir = os.path.abspath(args.out)
+    presets = load_presets(os.path.abspath(args.presets) if args.presets else None)
+
+    os.chdir(APP_DIR)
+    paths = render_reports(presets, out_dir, pages=args.pages, png=args.png, workers=args.workers)
+    for path in paths:
+        print(path)
+    print(f"Rendered {len(paths)} reports in {time.perf_counter() - start:.1f}s")
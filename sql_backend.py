@@ -0,0 +1,210 @@
+import threading
+
+import pandas as pd
+
+from aggregations import AGGREGATIONS
+
+# DuckDB is optional: without it the app filters and aggregates the in-memory
+# frame with pandas.
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# SQL expression computing each aggregation of aggregate() for a quoted
+# measure; like pandas, the sum of a group without values is 0
+SQL_AGGREGATIONS = {
+    'sum': 'COALESCE(SUM({measure}), 0)',
+    'mean': 'AVG({measure})',
+    'count': 'COUNT({measure})',
+    'min': 'MIN({measure})',
+    'max': 'MAX({measure})',
+    'median': 'MEDIAN({measure})',
+    'size': 'COUNT(*)',
+}
+
+# Column holding the position of each row in the Parquet file
+ROW_COLUMN = 'file_row_number'
+
+
+def sql_available():
+    """
+    Check whether the SQL backend can be used in this environment.
+
+    Returns:
+        bool: True if duckdb and pyarrow are installed
+    """
+    return duckdb is not None and pq is not None
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SQLBackend:
+    """
+    Embedded DuckDB engine answering the global filters and aggregations with
+    SQL run directly against the cached Parquet frame.
+
+    Filters are pushed down into the Parquet scan as predicates, so only the
+    columns a query names are read and row groups whose statistics rule out a
+    match are skipped. Aggregations return one small row per group instead of
+    the rows of the slice.
+
+    Rows are identified by their position in the Parquet file, which is the
+    row position in the frame returned by load_data.
+    """
+
+    def __init__(self, frame_path):
+        self.frame_path = frame_path
+        self.schema = pq.read_schema(frame_path)
+        self.columns = list(self.schema.names)
+        self._connection = duckdb.connect(':memory:')
+        self._lock = threading.Lock()
+
+    def _execute(self, sql, params):
+        # A connection must not be shared between threads; every query runs on
+        # its own cursor of the in-memory database
+        with self._lock:
+            cursor = self._connection.cursor()
+        try:
+            result = cursor.execute(sql, params).arrow()
+            return result.read_all() if hasattr(result, 'read_all') else result
+        finally:
+            cursor.close()
+
+    def _column(self, col):
+        if col not in self.columns:
+            raise KeyError(f"Column {col!r} is not in {self.frame_path}")
+        return _quote(col)
+
+    def _source(self):
+        return f"read_parquet(?, {ROW_COLUMN}=true)"
+
+    def where(self, ranges=None, isin=None):
+        """
+        Translate a filter state into a SQL predicate.
+
+        Args:
+            ranges (dict, optional): Column -> (low, high) inclusive bounds
+            isin (dict, optional): Column -> list of accepted values
+
+        Returns:
+            tuple: (predicate, params) with '?' placeholders for the values
+        """
+        clauses = []
+        params = []
+
+        for col, (low, high) in (ranges or {}).items():
+            clauses.append(f"{self._column(col)} BETWEEN ? AND ?")
+            params += [float(low), float(high)]
+
+        for col, values in (isin or {}).items():
+            values = [str(value) for value in values]
+            if not values:
+                clauses.append('FALSE')
+                continue
+            clauses.append(f"{self._column(col)} IN ({', '.join('?' * len(values))})")
+            params += values
+
+        return ' AND '.join(clauses) or 'TRUE', params
+
+    def select(self, ranges=None, isin=None, columns=None):
+        """
+        Read the rows matching a filter state.
+
+        Args:
+            ranges (dict, optional): Column -> (low, high) inclusive bounds
+            isin (dict, optional): Column -> list of accepted values
+            columns (list, optional): Columns to read; defaults to all
+
+        Returns:
+            pd.DataFrame: Matching rows with the dtypes of the cached frame,
+                indexed by their row position in it
+        """
+        columns = self.columns if columns is None else list(columns)
+        predicate, params = self.where(ranges, isin)
+        select_list = ', '.join([self._column(col) for col in columns] + [ROW_COLUMN])
+        sql = f"SELECT {select_list} FROM {self._source()} WHERE {predicate} ORDER BY {ROW_COLUMN}"
+        table = self._execute(sql, [self.frame_path] + params)
+
+        # DuckDB returns dictionary columns as plain strings; casting back to
+        # the cached schema restores categoricals and nullable integers
+        rows = table.column(ROW_COLUMN).to_numpy()
+        table = table.drop([ROW_COLUMN]).cast(self._schema_of(columns))
+        df = table.to_pandas()
+        df.index = pd.Index(rows, dtype='int64')
+        return df
+
+    def _schema_of(self, columns):
+        # The pandas metadata keeps nullable integer dtypes such as Int16
+        return pa.schema([self.schema.field(col) for col in columns], metadata=self.schema.metadata)
+
+    def aggregate(self, dimension, measure='funding_total_usd', aggs=('sum', 'mean', 'count'),
+                  ranges=None, isin=None, min_count=None, top_k=None, sort_by=None, ascending=False):
+        """
+        Aggregate a measure by a dimension over the rows matching a filter state.
+
+        Mirrors aggregations.aggregate, with the filters, grouping, threshold,
+        sort and top-k cut all evaluated by the SQL engine.
+
+        Args:
+            dimension (str): Column to group by
+            measure (str, optional): Numeric column to aggregate; None to only
+                count rows with 'size'
+            aggs (tuple): Aggregations from AGGREGATIONS, in output column order
+            ranges (dict, optional): Column -> (low, high) inclusive bounds
+            isin (dict, optional): Column -> list of accepted values
+            min_count (int, optional): Drop groups with fewer non-missing values
+                (fewer rows when measure is None)
+            top_k (int, optional): Keep the first top_k groups after sorting
+            sort_by (str, optional): Aggregation to sort by; defaults to the first
+                of `aggs` when top_k is given
+            ascending (bool): Sort order
+
+        Returns:
+            pd.DataFrame: The dimension column followed by one column per aggregation
+        """
+        unknown = [agg for agg in aggs if agg not in AGGREGATIONS]
+        if unknown:
+            raise ValueError(f"Unknown aggregations {unknown}, expected some of {AGGREGATIONS}")
+        if measure is None and any(agg != 'size' for agg in aggs):
+            raise ValueError("Only 'size' can be computed without a measure")
+
+        dim = self._column(dimension)
+        measure_sql = self._column(measure) if measure is not None else None
+        select_list = [dim] + [
+            f"{SQL_AGGREGATIONS[agg].format(measure=measure_sql)} AS {_quote(agg)}" for agg in aggs
+        ]
+
+        # pandas groupby leaves out rows with a missing group key
+        predicate, params = self.where(ranges, isin)
+        sql = (f"SELECT {', '.join(select_list)} FROM {self._source()} "
+               f"WHERE {predicate} AND {dim} IS NOT NULL GROUP BY {dim}")
+
+        if min_count is not None:
+            threshold = SQL_AGGREGATIONS['count' if measure is not None else 'size'].format(measure=measure_sql)
+            sql += f" HAVING {threshold} >= ?"
+            params.append(int(min_count))
+
+        if sort_by is None and top_k is not None:
+            sort_by = aggs[0]
+        if sort_by is not None:
+            order = SQL_AGGREGATIONS[sort_by].format(measure=measure_sql)
+            sql += f" ORDER BY {order} {'ASC' if ascending else 'DESC'} NULLS LAST, {dim}"
+        else:
+            # Groups come out in key order, like a pandas groupby
+            sql += f" ORDER BY {dim}"
+        if top_k is not None:
+            sql += " LIMIT ?"
+            params.append(int(top_k))
+
+        stats = self._execute(sql, [self.frame_path] + params).to_pandas()
+        return stats.astype({agg: 'float64' for agg in aggs if agg not in ('count', 'size')})
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from utils import box_statistics, create_box_plot, create_histogram
+
+
+def test_empty_frame():
+    df = pd.DataFrame({'market': pd.Series([], dtype=object), 'years': pd.Series([], dtype=float)})
+
+    stats, outliers = box_statistics(df, 'market', 'years')
+    assert list(stats.columns) == ['market', 'count', 'q1', 'median', 'q3', 'lowerfence', 'upperfence']
+    assert stats.empty and outliers.empty
+
+    assert len(create_box_plot(df, 'market', 'years', 'Empty').data) == 0
+
+
+def test_rows_dropped_as_missing():
+    df = pd.DataFrame({'market': ['SaaS', None], 'years': [np.nan, 2.0]})
+
+    stats, _ = box_statistics(df, 'market', 'years')
+    assert stats.empty
+
+    fig = create_histogram(df.assign(status=df['market']), 'years', 'Missing', color_col='status', marginal_box=True)
+    assert not any(trace.type == 'box' for trace in fig.data)
+
+
+def test_one_group_one_value():
+    df = pd.DataFrame({'market': ['SaaS'], 'years': [3.0]})
+
+    stats, outliers = box_statistics(df, 'market', 'years')
+    assert stats.to_dict('records') == [{
+        'market': 'SaaS', 'count': 1, 'q1': 3.0, 'median': 3.0, 'q3': 3.0,
+        'lowerfence': 3.0, 'upperfence': 3.0,
+    }]
+    assert outliers.empty
+
+    box = create_box_plot(df, 'market', 'years', 'One value').data[0]
+    assert list(box.x) == ['SaaS'] and list(box.median) == [3.0]
@@ -7,6 +7,151 @@ import seaborn as sns
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+import inspect
+import json
+import hashlib
+import functools
+import time
+import contextlib
+
+from aggregations import memoize
+from cache_utils import LRUCache
+from correlation import CorrelationStats
+from geo import map_detail, read_geometry, subset_features
+from chart_metrics import (
+    CHART_BUDGET_BYTES, CHART_BUDGET_POLICY, metrics_enabled, serialize_figure,
+    figure_points, fit_budget, log_chart
+)
+
+# Streamlit 1.50+ can track the selected tab and skip the others' content
+NATIVE_LAZY_TABS = 'on_change' in inspect.signature(st.tabs).parameters
+
+# Scatter plots with more points than SCATTER_MAX_POINTS are downsampled on
+# the server, and plots with more than SCATTER_WEBGL_THRESHOLD points are drawn
+# with WebGL instead of one SVG element per point
+SCATTER_MAX_POINTS = 10_000
+SCATTER_WEBGL_THRESHOLD = 2_000
+SCATTER_GRID_SIZE = 40
+SCATTER_OUTLIER_QUANTILE = 0.005
+
+# Box plots show at most BOX_MAX_OUTLIERS outliers per box
+BOX_MAX_OUTLIERS = 50
+
+# Serialized figures of the cached chart builders, bounded by total JSON size
+FIGURE_CACHE_MAX_ENTRIES = 1024
+FIGURE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Bundled map geometry (see geo.py) and the width maps are assumed to render at
+# when picking its level of detail
+WORLD_GEOMETRY = 'world_countries'
+INDIA_GEOMETRY = 'india_states'
+MAP_RENDER_WIDTH = 800
+
+# Figures collected by capture_charts() instead of being displayed; None while
+# pages render to the browser
+_captured_charts = None
+
+# Widgets inside a fragment only rerun the fragment function, not the whole
+# script; Streamlit releases without fragments fall back to full reruns
+if hasattr(st, 'fragment'):
+    _st_fragment = st.fragment
+elif hasattr(st, 'experimental_fragment'):
+    _st_fragment = st.experimental_fragment
+else:
+    def _st_fragment(func):
+        return func
+
+def fragment(func):
+    """
+    Run a page section as a Streamlit fragment.
+
+    Outside a script run Streamlit skips fragment bodies, so while charts are
+    captured (see capture_charts) the section runs as a plain function.
+
+    Args:
+        func (callable): Page section rendering widgets and charts
+
+    Returns:
+        callable: The section as a fragment
+    """
+    as_fragment = _st_fragment(func)
+
+    @functools.wraps(func)
+    def section(*args, **kwargs):
+        if _captured_charts is not None:
+            return func(*args, **kwargs)
+        return as_fragment(*args, **kwargs)
+
+    return section
+
+@st.cache_resource
+def load_figure_cache():
+    """
+    Create the process-wide cache of serialized figures.
+
+    Returns:
+        LRUCache: Figure JSON keyed by builder, input and arguments, bounded by
+            FIGURE_CACHE_MAX_ENTRIES and FIGURE_CACHE_MAX_BYTES
+    """
+    return LRUCache(max_entries=FIGURE_CACHE_MAX_ENTRIES, max_bytes=FIGURE_CACHE_MAX_BYTES, sizeof=len)
+
+def frame_fingerprint(df):
+    """
+    Fingerprint the content of a (small, aggregated) DataFrame.
+
+    Args:
+        df (pd.DataFrame): DataFrame to fingerprint
+
+    Returns:
+        str: Digest of the column names, dtypes, index and values
+    """
+    digest = hashlib.sha1()
+    digest.update(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def cached_figure(builder):
+    """
+    Cache the figures of a chart builder by the content of their input.
+
+    The key is a fingerprint of the DataFrame passed to the builder plus its
+    other arguments, so reruns that chart unchanged data skip building the
+    figure with Plotly Express. Every call gets its own figure rebuilt from
+    the cached JSON, which the caller may update like a fresh one.
+
+    Args:
+        builder (callable): Chart builder taking a DataFrame first
+
+    Returns:
+        callable: The builder with its figures cached
+    """
+    @functools.wraps(builder)
+    def cached_builder(df, *args, **kwargs):
+        key = (builder.__name__, frame_fingerprint(df), repr(args), repr(sorted(kwargs.items())))
+        cache = load_figure_cache()
+        spec = cache.get(key)
+        if spec is None:
+            fig = builder(df, *args, **kwargs)
+            cache.put(key, fig.to_json())
+            return fig
+        return go.Figure(json.loads(spec))
+
+    return cached_builder
+
+@st.cache_resource
+def load_geometry(name, level):
+    """
+    Load a bundled shape set once per process.
+
+    Args:
+        name (str): Shape set, e.g. INDIA_GEOMETRY
+        level (str): Level of detail from geo.DETAIL_LEVELS
+
+    Returns:
+        dict or None: GeoJSON FeatureCollection keyed by feature id, or None
+            when the shape set is not bundled
+    """
+    return read_geometry(name, level)
 
 # Set the page configuration with styling
 def set_page_config():
@@ -62,6 +207,47 @@ def set_page_config():
         </style>
     """, unsafe_allow_html=True)
 
+class _RadioTab:
+    # Stand-in for a tab container on Streamlit versions without stateful tabs
+    def __init__(self, container, is_open):
+        self.container = container
+        self.open = is_open
+
+    def __enter__(self):
+        self.container.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self.container.__exit__(*exc_info)
+
+def lazy_tabs(labels, key):
+    """
+    Create tabs whose content only runs while the tab is selected.
+
+    Wrap each tab's content in `if tab.open:` so hidden tabs neither compute
+    nor send their figures. Data the tabs share should come from memoized
+    helpers such as aggregations.aggregate so switching back is cheap.
+
+    Args:
+        labels (list): Tab labels
+        key (str): Widget key remembering the selected tab, unique per page
+
+    Returns:
+        list: One tab per label, each usable with `with` and having an `open` flag
+    """
+    # Reports capture the content of every tab
+    if _captured_charts is not None:
+        container = st.container()
+        return [_RadioTab(container, True) for _ in labels]
+
+    if NATIVE_LAZY_TABS:
+        return st.tabs(labels, key=key, on_change='rerun')
+
+    # Older Streamlit: a horizontal radio picks the single tab to render
+    selected = st.radio("View", labels, key=key, horizontal=True, label_visibility='collapsed')
+    container = st.container()
+    return [_RadioTab(container, label == selected) for label in labels]
+
 def display_metric_card(title, value, delta=None, delta_color="normal", help_text=None):
     """
     Display a metric in a styled card.
@@ -99,6 +285,135 @@ def display_metric_row(metrics_data):
                 help_text=metric.get('help_text')
             )
 
+def timed_builder(builder):
+    """
+    Record on every figure of a chart builder how long it took to build.
+
+    Args:
+        builder (callable): Chart builder returning a plotly figure
+
+    Returns:
+        callable: The builder, setting `fig._build_seconds` for render_chart
+    """
+    @functools.wraps(builder)
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        fig = builder(*args, **kwargs)
+        fig._build_seconds = time.perf_counter() - start
+        return fig
+
+    return timed
+
+def start_chart_metrics(page):
+    """
+    Attribute the charts rendered from now on to a page.
+
+    Args:
+        page (str): Name of the page being rendered
+    """
+    st.session_state['chart_page'] = page
+    st.session_state['chart_metrics'] = {}
+
+def render_chart(fig, name=None, **kwargs):
+    """
+    Display a plotly figure, measuring its payload and enforcing the byte budget.
+
+    When chart metrics are enabled (see chart_metrics.py), the figure is
+    serialized as st.plotly_chart will send it, and its size, build and
+    serialization times are logged and kept for the developer panel. Figures
+    over CHART_BUDGET_BYTES are downsampled, refused or flagged according to
+    CHART_BUDGET_POLICY.
+
+    Args:
+        fig (go.Figure): Figure to display
+        name (str, optional): Chart name in the metrics; defaults to its title
+        **kwargs: Passed on to st.plotly_chart
+
+    Returns:
+        The st.plotly_chart element, or None when the chart was refused or
+            captured
+    """
+    if _captured_charts is not None:
+        _captured_charts.append((name or fig.layout.title.text, fig))
+        return None
+
+    if not metrics_enabled():
+        return st.plotly_chart(fig, **kwargs)
+
+    records = st.session_state.setdefault('chart_metrics', {})
+    name = name or fig.layout.title.text or f"Chart {len(records) + 1}"
+    size, serialize_seconds = serialize_figure(fig)
+    build_seconds = getattr(fig, '_build_seconds', None)
+
+    sent, action = size, 'rendered'
+    if CHART_BUDGET_BYTES and size > CHART_BUDGET_BYTES:
+        if CHART_BUDGET_POLICY == 'downsample':
+            fig, sent = fit_budget(fig, size, CHART_BUDGET_BYTES)
+            action = 'downsampled' if fig is not None else 'refused'
+        else:
+            action = 'refused' if CHART_BUDGET_POLICY == 'refuse' else 'over budget'
+
+    record = {
+        'page': st.session_state.get('chart_page'),
+        'chart': name,
+        'bytes': size,
+        'bytes_sent': sent if action != 'refused' else 0,
+        'points': figure_points(fig) if fig is not None else None,
+        'build_ms': round(build_seconds * 1000, 1) if build_seconds is not None else None,
+        'serialize_ms': round(serialize_seconds * 1000, 1),
+        'action': action,
+    }
+    records[name] = record
+    log_chart(record)
+
+    if action == 'refused':
+        st.warning(f"Chart '{name}' is not shown: its {size / 1024:.0f} KB payload exceeds "
+                   f"the {CHART_BUDGET_BYTES / 1024:.0f} KB chart budget.")
+        return None
+    return st.plotly_chart(fig, **kwargs)
+
+@contextlib.contextmanager
+def capture_charts():
+    """
+    Collect the charts pages render instead of displaying them.
+
+    Used to run pages headlessly (see report.py): every lazy tab is opened and
+    render_chart appends the figures to the yielded list.
+
+    Yields:
+        list: (name, figure) pairs in rendering order
+    """
+    global _captured_charts
+    charts = []
+    previous, _captured_charts = _captured_charts, charts
+    try:
+        yield charts
+    finally:
+        _captured_charts = previous
+
+def show_chart_metrics():
+    """
+    Display the chart metrics of the current run, and the totals of every
+    page visited in this session, in the sidebar.
+    """
+    records = list(st.session_state.get('chart_metrics', {}).values())
+    totals = st.session_state.setdefault('chart_page_totals', {})
+    if records:
+        totals[records[0]['page']] = {
+            'charts': len(records),
+            'bytes_sent': sum(record['bytes_sent'] for record in records),
+            'build_ms': round(sum(record['build_ms'] or 0 for record in records), 1),
+            'serialize_ms': round(sum(record['serialize_ms'] for record in records), 1),
+        }
+
+    with st.sidebar.expander("Chart metrics"):
+        if not records:
+            st.caption("No charts rendered in this run.")
+            return
+        st.dataframe(pd.DataFrame(records).drop(columns='page'), hide_index=True)
+        st.caption("Totals per page")
+        st.dataframe(pd.DataFrame.from_dict(totals, orient='index'))
+
 def format_large_number(num):
     """
     Format large numbers with appropriate suffixes (K, M, B).
@@ -132,21 +447,34 @@ def format_large_number(num):
         else:
             return f"{num:.2f}{suffixes[magnitude]}"
 
-def create_plotly_choropleth(df, value_column, title, color_scale='Blues'):
+@timed_builder
+@cached_figure
+def create_plotly_choropleth(df, value_column, title, color_scale='Blues', width=MAP_RENDER_WIDTH):
     """
     Create a plotly choropleth map.
     
+    Countries are drawn from the bundled world geometry at the level of
+    detail that fits the render width, and only the countries with data are
+    sent to the browser. Without bundled geometry the map falls back to
+    Plotly's built-in country shapes, which the browser downloads.
+    
     Args:
         df (pd.DataFrame): DataFrame with country data
         value_column (str): Column with values to plot
         title (str): Chart title
         color_scale (str): Color scale for the map
+        width (int): Width the map is rendered at in pixels
         
     Returns:
         plotly figure: Choropleth map
     """
     # Group by country and get the count or sum
-    country_data = df.groupby('country_code')[value_column].sum().reset_index()
+    country_data = df.groupby('country_code', observed=True)[value_column].sum().reset_index()
+    
+    geometry = load_geometry(WORLD_GEOMETRY, map_detail(360, width))
+    shapes = {}
+    if geometry is not None:
+        shapes = dict(geojson=subset_features(geometry, country_data['country_code']), featureidkey='id')
     
     fig = px.choropleth(
         country_data,
@@ -155,9 +483,14 @@ def create_plotly_choropleth(df, value_column, title, color_scale='Blues'):
         hover_name='country_code',
         color_continuous_scale=color_scale,
         projection='natural earth',
-        title=title
+        title=title,
+        **shapes
     )
     
+    if geometry is not None:
+        # The base map would load Plotly's own shapes from its CDN
+        fig.update_geos(visible=False)
+    
     fig.update_layout(
         margin={"r":0,"t":50,"l":0,"b":0},
         coloraxis_colorbar=dict(
@@ -167,6 +500,8 @@ def create_plotly_choropleth(df, value_column, title, color_scale='Blues'):
     
     return fig
 
+@timed_builder
+@cached_figure
 def create_heatmap(df, x_col, y_col, value_col, title):
     """
     Create a heatmap visualization.
@@ -186,7 +521,8 @@ def create_heatmap(df, x_col, y_col, value_col, title):
         values=value_col, 
         index=y_col, 
         columns=x_col, 
-        aggfunc='mean'
+        aggfunc='mean',
+        observed=True
     ).fillna(0)
     
     fig = px.imshow(
@@ -238,6 +574,8 @@ def create_wordcloud(text_series, title, max_words=100):
     
     return fig
 '''
+@timed_builder
+@cached_figure
 def create_time_series(df, time_col, value_col, title, color='#4F8BF9'):
     """
     Create a time series visualization.
@@ -273,6 +611,8 @@ def create_time_series(df, time_col, value_col, title, color='#4F8BF9'):
     
     return fig
 
+@timed_builder
+@cached_figure
 def create_bar_chart(df, x_col, y_col, title, color='#4F8BF9', horizontal=False):
     """
     Create a bar chart visualization.
@@ -314,9 +654,84 @@ def create_bar_chart(df, x_col, y_col, title, color='#4F8BF9', horizontal=False)
     
     return fig
 
-def create_scatter_plot(df, x_col, y_col, title, color_col=None, size_col=None):
+def downsample_scatter(df, x_col, y_col, color_col=None, max_points=SCATTER_MAX_POINTS,
+                       log_x=False, log_y=False, grid_size=SCATTER_GRID_SIZE,
+                       outlier_quantile=SCATTER_OUTLIER_QUANTILE, seed=0):
+    """
+    Thin out the points of a scatter plot while keeping its visible shape.
+
+    Points are stratified by colour group and by cell of a grid laid over the
+    plot area (in log space on log axes), and every stratum keeps the same
+    fraction of its points, but at least one. Dense regions are thinned, sparse
+    regions and small groups stay visible, and points in the outer quantiles
+    of either axis are always kept. The sample is seeded, so reruns plot the
+    same points.
+
+    Args:
+        df (pd.DataFrame): DataFrame with data
+        x_col (str): Column for x-axis
+        y_col (str): Column for y-axis
+        color_col (str, optional): Column the points are coloured by
+        max_points (int): Approximate number of points to keep
+        log_x (bool): Whether the x-axis is drawn on a log scale
+        log_y (bool): Whether the y-axis is drawn on a log scale
+        grid_size (int): Grid cells per axis
+        outlier_quantile (float): Points below this quantile or above its
+            complement on either axis are outliers
+        seed (int): Seed of the sample
+
+    Returns:
+        pd.DataFrame: The kept rows of df, in their original order
+    """
+    # Points without both coordinates are not drawn anyway
+    df = df[df[x_col].notna().to_numpy() & df[y_col].notna().to_numpy()]
+    n_points = len(df)
+    if n_points <= max_points:
+        return df
+
+    keep_outliers = np.zeros(n_points, dtype=bool)
+    cells = np.zeros(n_points, dtype=np.int64)
+    for col, log in [(x_col, log_x), (y_col, log_y)]:
+        values = df[col].to_numpy(dtype=np.float64)
+        low, high = np.quantile(values, [outlier_quantile, 1 - outlier_quantile])
+        keep_outliers |= (values < low) | (values > high)
+
+        # Grid cells in the coordinates the axis is drawn in
+        if log:
+            values = np.log10(np.where(values > 0, values, np.nan))
+        values = np.nan_to_num(values, nan=np.nanmin(values) if np.isfinite(values).any() else 0)
+        span = values.max() - values.min()
+        cell = np.floor((values - values.min()) / span * (grid_size - 1)) if span > 0 else np.zeros(n_points)
+        cells = cells * grid_size + cell.astype(np.int64)
+
+    # Categorical colours are strata of their own; continuous colours are not
+    if color_col is not None and not pd.api.types.is_numeric_dtype(df[color_col]):
+        groups, _ = pd.factorize(df[color_col], use_na_sentinel=False)
+        cells = groups.astype(np.int64) * grid_size * grid_size + cells
+    strata, _ = pd.factorize(cells)
+
+    # Keep the first quota points of every stratum in a random order
+    rng = np.random.default_rng(seed)
+    counts = np.bincount(strata)
+    budget = max(max_points - int(keep_outliers.sum()), 0)
+    quota = np.maximum(1, np.floor(counts * budget / n_points)).astype(np.int64)
+
+    order = np.lexsort((rng.random(n_points), strata))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.arange(n_points) - starts[strata[order]]
+    keep = keep_outliers.copy()
+    keep[order[rank < quota[strata[order]]]] = True
+
+    return df[keep]
+
+@timed_builder
+def create_scatter_plot(df, x_col, y_col, title, color_col=None, size_col=None,
+                        log_x=False, log_y=False, labels=None, full_resolution=False):
     """
     Create a scatter plot visualization.
+
+    Large plots are downsampled on the server with downsample_scatter, and
+    plots that still have many points are drawn with WebGL.
     
     Args:
         df (pd.DataFrame): DataFrame with data
@@ -325,10 +740,20 @@ def create_scatter_plot(df, x_col, y_col, title, color_col=None, size_col=None):
         title (str): Chart title
         color_col (str, optional): Column for point colors
         size_col (str, optional): Column for point sizes
+        log_x (bool): Draw the x-axis on a log scale
+        log_y (bool): Draw the y-axis on a log scale
+        labels (dict, optional): Axis and legend titles by column
+        full_resolution (bool): Plot every point instead of a sample
         
     Returns:
         plotly figure: Scatter plot visualization
     """
+    if not full_resolution:
+        n_points = int((df[x_col].notna() & df[y_col].notna()).sum())
+        df = downsample_scatter(df, x_col, y_col, color_col, log_x=log_x, log_y=log_y)
+        if len(df) < n_points:
+            title = f"{title} ({len(df):,} of {n_points:,} points)"
+
     fig = px.scatter(
         df,
         x=x_col,
@@ -336,16 +761,22 @@ def create_scatter_plot(df, x_col, y_col, title, color_col=None, size_col=None):
         color=color_col,
         size=size_col,
         title=title,
-        opacity=0.7
+        opacity=0.7,
+        log_x=log_x,
+        log_y=log_y,
+        labels=labels,
+        render_mode='webgl' if len(df) > SCATTER_WEBGL_THRESHOLD else 'svg'
     )
     
     fig.update_layout(
-        xaxis_title=x_col,
-        yaxis_title=y_col
+        xaxis_title=(labels or {}).get(x_col, x_col),
+        yaxis_title=(labels or {}).get(y_col, y_col)
     )
     
     return fig
 
+@timed_builder
+@cached_figure
 def create_pie_chart(df, names_col, values_col, title):
     """
     Create a pie chart visualization.
@@ -370,38 +801,227 @@ def create_pie_chart(df, names_col, values_col, title):
     
     return fig
 
-def create_histogram(df, column, title, nbins=30, color='#4F8BF9'):
+def histogram_bins(values, nbins=30, log=False, edges=None):
+    """
+    Compute histogram bin edges and counts on the server.
+
+    Args:
+        values (array-like): Values to bin; missing values are ignored, and so
+            are values that are not positive on a log scale
+        nbins (int): Number of equally wide bins
+        log (bool): Make the bins equally wide in log10 of the values
+        edges (np.ndarray, optional): Reuse these edges instead of deriving
+            them from the values, so several groups share the same bins
+
+    Returns:
+        tuple: (edges, counts) with nbins + 1 edges, in log10 units when log
+    """
+    values = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    values = values[np.isfinite(values)]
+    if log:
+        values = np.log10(values[values > 0])
+
+    if edges is None:
+        edges = np.histogram_bin_edges(values, bins=nbins) if len(values) else np.linspace(0, 1, nbins + 1)
+    counts, _ = np.histogram(values, bins=edges)
+    return edges, counts
+
+def _log_tick_text(exponent):
+    value = 10.0 ** exponent
+    return format_large_number(value) if value >= 1 else f"{value:g}"
+
+@timed_builder
+def create_histogram(df, column, title, nbins=30, color='#4F8BF9', color_col=None,
+                     log_x=False, marginal_box=False, barmode='overlay', opacity=None):
     """
-    Create a histogram visualization.
+    Create a histogram visualization from counts binned on the server.
+
+    Only one bar per bin and group is sent to the browser, so the size of the
+    figure does not depend on the number of rows.
     
     Args:
         df (pd.DataFrame): DataFrame with data
         column (str): Column to plot
         title (str): Chart title
         nbins (int): Number of bins
-        color (str): Bar color
+        color (str): Bar color, when there is a single group
+        color_col (str, optional): Column to split the rows into groups by;
+            all groups share the same bins
+        log_x (bool): Use bins equally wide in log10 of the values, labelled
+            with the values themselves
+        marginal_box (bool): Add a box plot per group above the histogram
+        barmode (str): 'overlay' or 'stack' for grouped histograms
+        opacity (float, optional): Bar opacity
         
     Returns:
         plotly figure: Histogram visualization
     """
-    fig = px.histogram(
-        df,
-        x=column,
-        nbins=nbins,
-        title=title,
-        color_discrete_sequence=[color]
-    )
-    
+    edges, _ = histogram_bins(df[column], nbins=nbins, log=log_x)
+    if marginal_box:
+        # Boxes summarize the values on the scale of the bins
+        values = pd.to_numeric(df[column], errors='coerce').astype(np.float64)
+        if log_x:
+            values = np.log10(values.where(values > 0))
+        box_rows = pd.DataFrame({'group': df[color_col] if color_col is not None else column, column: values})
+        box_stats, box_outliers = box_statistics(box_rows, 'group', column)
+
+    if color_col is not None:
+        groups = [(str(name), rows[column]) for name, rows in df.groupby(color_col, observed=True)[[column]]]
+        colors = px.colors.qualitative.Plotly
+    else:
+        groups = [(column, df[column])]
+        colors = [color]
+
+    if marginal_box:
+        fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.2, 0.8], vertical_spacing=0.03)
+    else:
+        fig = go.Figure()
+
+    for i, (name, values) in enumerate(groups):
+        _, counts = histogram_bins(values, log=log_x, edges=edges)
+        low, high = (10.0 ** edges[:-1], 10.0 ** edges[1:]) if log_x else (edges[:-1], edges[1:])
+        bar = go.Bar(
+            x=(edges[:-1] + edges[1:]) / 2,
+            y=counts,
+            width=np.diff(edges),
+            name=name,
+            legendgroup=name,
+            showlegend=color_col is not None,
+            marker_color=colors[i % len(colors)],
+            opacity=opacity,
+            customdata=np.column_stack([low, high]),
+            hovertemplate='%{customdata[0]:,.4~g} to %{customdata[1]:,.4~g}<br>Count: %{y}<extra>' + name + '</extra>'
+        )
+
+        if marginal_box:
+            fig.add_trace(bar, row=2, col=1)
+            in_group = box_stats['group'].astype(str) == name
+            group_outliers = box_outliers[box_outliers['group'].astype(str).to_numpy() == name]
+            for trace in box_traces(box_stats[in_group.to_numpy()], group_outliers, 'group', column,
+                                    colors[i % len(colors)], horizontal=True):
+                trace.update(legendgroup=name, showlegend=False)
+                fig.add_trace(trace, row=1, col=1)
+        else:
+            fig.add_trace(bar)
+
     fig.update_layout(
-        xaxis_title=column,
-        yaxis_title="Count"
+        title=title,
+        barmode=barmode,
+        bargap=0,
+        yaxis_title="Count" if not marginal_box else None
     )
+    if marginal_box:
+        fig.update_yaxes(title_text="Count", row=2, col=1)
+        fig.update_yaxes(showticklabels=False, row=1, col=1)
+    fig.update_xaxes(title_text=column, row=2 if marginal_box else None, col=1 if marginal_box else None)
+
+    if log_x:
+        # Label the log10 axis with the values themselves
+        exponents = np.arange(np.floor(edges[0]), np.ceil(edges[-1]) + 1)
+        fig.update_xaxes(tickvals=exponents, ticktext=[_log_tick_text(exponent) for exponent in exponents])
     
     return fig
 
-def create_box_plot(df, x_col, y_col, title, color='#4F8BF9'):
+def box_statistics(df, group_col, value_col, max_outliers=BOX_MAX_OUTLIERS, seed=0):
     """
-    Create a box plot visualization.
+    Compute the statistics of a box plot per group on the server.
+
+    Quartiles are computed for every group at once with groupby().quantile,
+    using linear interpolation like Plotly. Whiskers end at the furthest values
+    within 1.5 IQR of the box, and values beyond them are outliers.
+
+    Args:
+        df (pd.DataFrame): DataFrame with data
+        group_col (str): Column defining the boxes
+        value_col (str): Column summarized by the boxes
+        max_outliers (int): Outliers kept per group: a seeded random sample
+            that always includes the lowest and highest value
+        seed (int): Seed of the outlier sample
+
+    Returns:
+        tuple: (stats, outliers) where stats has group_col, 'count', 'q1',
+            'median', 'q3', 'lowerfence' and 'upperfence' per group, and
+            outliers has the group_col and value_col of the kept outliers
+    """
+    rows = df[[group_col, value_col]]
+    rows = rows[rows[group_col].notna().to_numpy() & rows[value_col].notna().to_numpy()]
+    grouped = rows.groupby(group_col, observed=True)[value_col]
+
+    # Reindexing keeps the quartile columns when no rows are left
+    stats = grouped.quantile([0.25, 0.5, 0.75]).unstack().reindex(columns=[0.25, 0.5, 0.75])
+    stats.columns = ['q1', 'median', 'q3']
+    stats.insert(0, 'count', grouped.count())
+
+    iqr = stats['q3'] - stats['q1']
+    groups = rows[group_col].astype(object)
+    low = groups.map(stats['q1'] - 1.5 * iqr).to_numpy(dtype=np.float64)
+    high = groups.map(stats['q3'] + 1.5 * iqr).to_numpy(dtype=np.float64)
+    values = rows[value_col].to_numpy(dtype=np.float64)
+    inside = (values >= low) & (values <= high)
+
+    whiskers = rows[inside].groupby(group_col, observed=True)[value_col].agg(['min', 'max'])
+    stats['lowerfence'] = whiskers['min']
+    stats['upperfence'] = whiskers['max']
+
+    outliers = rows[~inside]
+    if len(outliers):
+        by_group = outliers.groupby(group_col, observed=True)[value_col]
+        extremes = outliers.loc[pd.concat([by_group.idxmin(), by_group.idxmax()]).unique()]
+        sample = outliers.sample(frac=1, random_state=seed).groupby(group_col, observed=True).head(max(max_outliers - 2, 0))
+        outliers = pd.concat([extremes, sample])
+        outliers = outliers[~outliers.index.duplicated()]
+
+    return stats.reset_index(), outliers
+
+def box_traces(stats, outliers, group_col, value_col, color, name=None, horizontal=False):
+    """
+    Create the traces of box plots from statistics computed by box_statistics.
+
+    Args:
+        stats (pd.DataFrame): Statistics per group
+        outliers (pd.DataFrame): Outliers per group
+        group_col (str): Column defining the boxes
+        value_col (str): Column summarized by the boxes
+        color (str): Box and outlier color
+        name (str, optional): Trace name; the boxes are shown in the legend
+            under this name when given
+        horizontal (bool): Draw the boxes along the x-axis
+
+    Returns:
+        list: A box trace holding every box, and a marker trace of the
+            outliers; empty when there are no boxes
+    """
+    if stats.empty:
+        return []
+
+    positions = stats[group_col].astype(str).tolist()
+    box = go.Box(
+        q1=stats['q1'], median=stats['median'], q3=stats['q3'],
+        lowerfence=stats['lowerfence'], upperfence=stats['upperfence'],
+        name=name or value_col, legendgroup=name, showlegend=name is not None,
+        marker_color=color, boxpoints=False,
+        orientation='h' if horizontal else 'v',
+        **{'y' if horizontal else 'x': positions}
+    )
+
+    outlier_positions = outliers[group_col].astype(str).tolist()
+    points = go.Scatter(
+        mode='markers',
+        name=name or value_col, legendgroup=name, showlegend=False,
+        marker=dict(color=color, symbol='circle-open', size=5),
+        **({'x': outliers[value_col], 'y': outlier_positions} if horizontal
+           else {'x': outlier_positions, 'y': outliers[value_col]})
+    )
+    return [box, points]
+
+@timed_builder
+def create_box_plot(df, x_col, y_col, title, color='#4F8BF9', labels=None):
+    """
+    Create a box plot visualization from statistics computed on the server.
+
+    Only the quartiles, whiskers and a capped sample of outliers of each box
+    are sent to the browser, so the size of the figure grows with the number
+    of groups rather than the number of rows.
     
     Args:
         df (pd.DataFrame): DataFrame with data
@@ -409,28 +1029,30 @@ def create_box_plot(df, x_col, y_col, title, color='#4F8BF9'):
         y_col (str): Column for y-axis (values)
         title (str): Chart title
         color (str): Box color
+        labels (dict, optional): Axis titles by column
         
     Returns:
         plotly figure: Box plot visualization
     """
-    fig = px.box(
-        df,
-        x=x_col,
-        y=y_col,
-        title=title,
-        color_discrete_sequence=[color]
-    )
+    stats, outliers = box_statistics(df, x_col, y_col)
+    fig = go.Figure(box_traces(stats, outliers, x_col, y_col, color))
     
     fig.update_layout(
-        xaxis_title=x_col,
-        yaxis_title=y_col
+        title=title,
+        xaxis_title=(labels or {}).get(x_col, x_col),
+        yaxis_title=(labels or {}).get(y_col, y_col),
+        showlegend=False
     )
     
     return fig
 
+@timed_builder
 def create_correlation_matrix(df, columns, title):
     """
     Create a correlation matrix visualization.
+
+    The correlations are looked up from sufficient statistics accumulated once
+    per slice, so changing the selected columns does not rescan the rows.
     
     Args:
         df (pd.DataFrame): DataFrame with data
@@ -441,9 +1063,9 @@ def create_correlation_matrix(df, columns, title):
         plotly figure: Correlation matrix visualization
     """
     # Calculate correlation matrix
-    corr = df[columns].corr()
+    corr = memoize(df, ('correlation_stats',), CorrelationStats.from_frame).corr(columns)
     
-    # Create heatmap
+    # Create heatmap, with the correlation values as its text layer
     fig = px.imshow(
         corr,
         x=corr.columns,
@@ -451,22 +1073,10 @@ def create_correlation_matrix(df, columns, title):
         color_continuous_scale='RdBu_r',
         title=title,
         zmin=-1,
-        zmax=1
+        zmax=1,
+        text_auto='.2f'
     )
     
-    # Add correlation values as text
-    for i, row in enumerate(corr.values):
-        for j, val in enumerate(row):
-            fig.add_annotation(
-                x=j,
-                y=i,
-                text=f"{val:.2f}",
-                showarrow=False,
-                font=dict(
-                    color="white" if abs(val) > 0.5 else "black"
-                )
-            )
-    
     fig.update_layout(
         height=600,
         width=800